@@ -127,8 +127,19 @@ class MandatoryScheduleForm(CustomModelForm):
 class SolvedScheduleForm(forms.ModelForm):
     class Meta:
         model = models.SolvedSchedule
-        fields = ["name"]
-        labels = {"name": "Schedule Name"}
+        fields = ["name", "warm_start", "repair", "alternatives"]
+        labels = {
+            "name": "Schedule Name",
+            "warm_start": "Start from the most recent schedule",
+            "repair": "Repair the most recent schedule",
+            "alternatives": "Number of schedules",
+        }
         help_texts = {
-            "name": "Provide a name for this created " "schedule for future reference"
+            "name": "Provide a name for this created " "schedule for future reference",
+            "warm_start": "Speeds up solving when the data changed only slightly "
+            "since the last schedule was found",
+            "repair": "Keeps every course the data changes since the last schedule "
+            "do not affect and only re-solves the rest",
+            "alternatives": "Find up to this many schedules that place courses in "
+            "different periods, each saved under its own name",
         }
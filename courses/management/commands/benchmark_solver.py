@@ -0,0 +1,129 @@
+import json
+import platform
+import resource
+import subprocess
+
+from django.core.management.base import BaseCommand
+
+from courses.solver import backends
+from courses.solver.benchmark import PHASES, run_benchmark
+from courses.synthetic import TIERS, generate_tier
+
+REPORT_VERSION = 1
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark loading, building, solving and saving synthetic or existing "
+        "organizations and write a JSON report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tiers", nargs="+", choices=sorted(TIERS))
+        parser.add_argument("--seeds", type=int, default=3)
+        parser.add_argument("--orgs", nargs="+", type=int, default=[])
+        parser.add_argument(
+            "--instances", nargs="+", default=[], help="Exported instance files"
+        )
+        parser.add_argument("--backends", nargs="+", default=["highs-matrix"])
+        parser.add_argument("--time-limit", type=float)
+        parser.add_argument(
+            "--trace-memory",
+            action="store_true",
+            help="Run every benchmark a second time to record peak Python memory",
+        )
+        parser.add_argument("--output", help="Write the JSON report to this file")
+        parser.add_argument("--compare", help="JSON report to compare against")
+
+    def get_backend(self, name, time_limit):
+        backend = backends.get_backend(name)
+        backend.tee = False
+        if time_limit is not None:
+            backend.time_limit = time_limit
+        return backend
+
+    def run(self, key, options, org_pk=None, path=None):
+        runs = []
+        for name in options["backends"]:
+            run = run_benchmark(
+                self.get_backend(name, options["time_limit"]),
+                org_pk,
+                path,
+                options["trace_memory"],
+            )
+            run["id"] = f"{key}/{name}"
+            runs.append(run)
+            self.stderr.write(
+                f"{run['id']}: {run['status']} {run['objective']} "
+                + " ".join(f"{p}={run['phases'][p]['seconds']:.3f}s" for p in PHASES)
+            )
+        return runs
+
+    def compare(self, base, runs):
+        base_runs = {run["id"]: run for run in base["runs"]}
+        self.stdout.write("id\tphase\tbase\tnew\tratio")
+        for run in runs:
+            if run["id"] not in base_runs:
+                continue
+            base_run = base_runs[run["id"]]
+            if base_run["objective"] != run["objective"]:
+                self.stdout.write(
+                    f"{run['id']}\tobjective\t{base_run['objective']}\t"
+                    f"{run['objective']}\t"
+                )
+            for phase in PHASES:
+                if phase not in base_run["phases"]:
+                    continue
+                old = base_run["phases"][phase]["seconds"]
+                new = run["phases"][phase]["seconds"]
+                self.stdout.write(
+                    f"{run['id']}\t{phase}\t{old:.3f}\t{new:.3f}\t"
+                    f"{new / old if old else float('inf'):.2f}"
+                )
+
+    def handle(self, *args, **options):
+        tiers = options["tiers"]
+        if tiers is None:
+            tiers = (
+                [] if options["orgs"] or options["instances"] else ["small", "medium"]
+            )
+        runs = []
+        for org_pk in options["orgs"]:
+            runs += self.run(f"org-{org_pk}", options, org_pk=org_pk)
+        for path in options["instances"]:
+            runs += self.run(path, options, path=path)
+        for tier in tiers:
+            for seed in range(options["seeds"]):
+                organization = generate_tier(tier, seed, f"Benchmark {tier} {seed}")
+                try:
+                    runs += self.run(f"{tier}/{seed}", options, org_pk=organization.pk)
+                finally:
+                    organization.delete()
+
+        report = {
+            "version": REPORT_VERSION,
+            "commit": get_commit(),
+            "python": platform.python_version(),
+            "tiers": {tier: TIERS[tier] for tier in tiers},
+            "max_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            "runs": runs,
+        }
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                f.write(text + "\n")
+        elif not options["compare"]:
+            self.stdout.write(text)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                self.compare(json.load(f), runs)
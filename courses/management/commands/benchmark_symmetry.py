@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses import models
+from courses.solver import backends
+from courses.solver.matrix import build_matrix
+from courses.solver.model import create_model
+from courses.solver.snapshot import load_snapshot
+
+
+class Command(BaseCommand):
+    help = "Solve organizations with and without symmetry breaking and compare"
+
+    def add_arguments(self, parser):
+        parser.add_argument("org_pks", nargs="*", type=int)
+        parser.add_argument("--backend", default="highs-matrix")
+
+    def solve(self, snapshot, backend, symmetry_breaking):
+        if backend.formulation == "matrix":
+            result, _ = backend.solve_matrix(build_matrix(snapshot, symmetry_breaking))
+            return result
+        return backend.solve(create_model(snapshot, symmetry_breaking))
+
+    def handle(self, *args, **options):
+        backend = backends.get_backend(options["backend"])
+        backend.tee = False
+        org_pks = options["org_pks"] or models.Organization.objects.values_list(
+            "pk", flat=True
+        )
+
+        self.stdout.write("org\tsymmetry\tstatus\tobjective\tnodes\tseconds")
+        for org_pk in org_pks:
+            snapshot = load_snapshot(org_pk)
+            for symmetry_breaking in (False, True):
+                start = time.perf_counter()
+                try:
+                    result = self.solve(snapshot, backend, symmetry_breaking)
+                except ValueError as e:
+                    self.stderr.write(f"Organization {org_pk} failed. ERROR: {e}")
+                    break
+                self.stdout.write(
+                    f"{org_pk}\t{symmetry_breaking}\t{result.status}\t"
+                    f"{result.objective}\t{result.nodes}\t"
+                    f"{time.perf_counter() - start:.2f}"
+                )
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courses import models
+from courses.solver.instance import write_instance
+from courses.solver.snapshot import load_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Export the scheduling data of an organization to an instance file, "
+        "gzipped when the path ends with .gz"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("org_pk", type=int)
+        parser.add_argument("path")
+        parser.add_argument(
+            "--anonymize",
+            action="store_true",
+            help="Replace teacher, room, course and schedule names with their pks",
+        )
+
+    def handle(self, *args, **options):
+        if not models.Organization.objects.filter(pk=options["org_pk"]).exists():
+            raise CommandError(f"Organization {options['org_pk']} does not exist")
+        write_instance(
+            load_snapshot(options["org_pk"]), options["path"], options["anonymize"]
+        )
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from courses.synthetic import TIERS, generate_tier
+
+
+class Command(BaseCommand):
+    help = "Create seeded synthetic organizations for benchmarking the solver"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tier", choices=sorted(TIERS), default="small")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--count", type=int, default=1)
+
+    def handle(self, *args, **options):
+        for seed in range(options["seed"], options["seed"] + options["count"]):
+            organization = generate_tier(
+                options["tier"], seed, f"Synthetic {options['tier']} {seed}"
+            )
+            self.stdout.write(f"{organization.pk}\t{organization.name}")
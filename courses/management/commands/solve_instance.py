@@ -0,0 +1,71 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.solver import backends
+from courses.solver.decompose import get_components
+from courses.solver.instance import read_instance
+from courses.solver.metrics import SolveMetrics
+from courses.solver.pipeline import solve_components
+from courses.solver.precheck import check_snapshot
+from courses.solver.presolve import presolve
+from courses.solver.progress import Progress
+
+
+class Command(BaseCommand):
+    help = "Solve an exported instance file without touching the database"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--backend")
+        parser.add_argument("--time-limit", type=float)
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument(
+            "--output", help="Write the status, metrics and assignments to this file"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            snapshot = read_instance(options["path"])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read {options['path']}: {e}")
+
+        metrics = SolveMetrics()
+        with metrics.phase("precheck"):
+            problems = check_snapshot(snapshot)
+        if problems:
+            raise CommandError("\n".join(problems))
+        with metrics.phase("presolve"):
+            snapshot = presolve(snapshot, metrics)
+
+        backend = backends.get_backend(options["backend"])
+        backend.tee = False
+        if options["time_limit"] is not None:
+            backend.time_limit = options["time_limit"]
+        try:
+            solver_result, assignments, _ = solve_components(
+                get_components(snapshot),
+                backend,
+                Progress(None, backend.time_limit),
+                processes=options["processes"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        metrics.merge(solver_result.metrics)
+
+        self.stdout.write(
+            f"{solver_result.status}\t{solver_result.objective}\t"
+            f"{solver_result.bound}\t{len(assignments)} assignments"
+        )
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(
+                    {
+                        **metrics.summary(backend.name, solver_result.status),
+                        "objective": solver_result.objective,
+                        "bound": solver_result.bound,
+                        "assignments": sorted(list(a) for a in assignments),
+                    },
+                    f,
+                    indent=2,
+                )
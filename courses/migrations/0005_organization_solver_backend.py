@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0004_scheduleitem_solvedschedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="organization",
+            name="solver_backend",
+            field=models.CharField(
+                blank=True,
+                help_text="Name of a SOLVER_BACKENDS entry to use instead of the default",
+                max_length=50,
+            ),
+        ),
+    ]
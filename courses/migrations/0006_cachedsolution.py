@@ -0,0 +1,41 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_organization_solver_backend"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedSolution",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("assignments", models.JSONField()),
+                ("last_used", models.DateTimeField(auto_now=True)),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="courses.organization",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("organization", "key")},
+            },
+        ),
+    ]
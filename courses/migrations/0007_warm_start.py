@@ -0,0 +1,42 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0006_cachedsolution"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="course_pk",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="scheduleitem",
+            name="teacher_pk",
+            field=models.PositiveIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="warm_start",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="warm_start_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("accepted", "Accepted as a starting solution"),
+                    ("cutoff", "Used as an objective cutoff"),
+                    ("infeasible", "Infeasible for the current data"),
+                    ("unavailable", "No previous schedule to start from"),
+                ],
+                max_length=20,
+            ),
+        ),
+    ]
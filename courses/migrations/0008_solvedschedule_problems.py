@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0007_warm_start"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="problems",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
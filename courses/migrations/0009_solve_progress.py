@@ -0,0 +1,44 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+def mark_solved_optimal(apps, schema_editor):
+    SolvedSchedule = apps.get_model("courses", "SolvedSchedule")
+    SolvedSchedule.objects.filter(solved=True).update(optimal=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0008_solvedschedule_problems"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="bound",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="elapsed",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="gap",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="objective",
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="optimal",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_solved_optimal, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0009_solve_progress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="portfolio",
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="solver_backend",
+            field=models.CharField(blank=True, max_length=50),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0010_solver_portfolio"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="metrics",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
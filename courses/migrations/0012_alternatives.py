@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:53
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0011_solve_metrics"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="alternative_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="alternative_schedules",
+                to="courses.solvedschedule",
+            ),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="alternatives",
+            field=models.PositiveIntegerField(
+                default=1,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(10),
+                ],
+            ),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.2.25 on 2026-10-18 19:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0012_alternatives"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="repair",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="repair_of",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="repairs",
+                to="courses.solvedschedule",
+            ),
+        ),
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="repaired_courses",
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0013_repair"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="solvedschedule",
+            name="conflicts",
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
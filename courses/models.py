@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 
 
@@ -8,10 +10,21 @@ class Organization(models.Model):
     city = models.CharField(max_length=200)
     state = models.CharField(max_length=200)
     zipcode = models.CharField(max_length=20)
+    solver_backend = models.CharField(
+        max_length=50,
+        blank=True,
+        help_text="Name of a SOLVER_BACKENDS entry to use instead of the default",
+    )
 
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if self.solver_backend and self.solver_backend not in settings.SOLVER_BACKENDS:
+            raise ValidationError(
+                {"solver_backend": f"Unknown solver backend '{self.solver_backend}'"}
+            )
+
 
 class OrgData(models.Model):
     organization = models.ForeignKey(Organization, models.CASCADE)
@@ -124,11 +137,51 @@ class MandatorySchedule(OrgData):
 
 
 class SolvedSchedule(OrgData):
+    WARM_START_ACCEPTED = "accepted"
+    WARM_START_CUTOFF = "cutoff"
+    WARM_START_INFEASIBLE = "infeasible"
+    WARM_START_UNAVAILABLE = "unavailable"
+    WARM_START_STATUSES = [
+        (WARM_START_ACCEPTED, "Accepted as a starting solution"),
+        (WARM_START_CUTOFF, "Used as an objective cutoff"),
+        (WARM_START_INFEASIBLE, "Infeasible for the current data"),
+        (WARM_START_UNAVAILABLE, "No previous schedule to start from"),
+    ]
+
     name = models.CharField(
         max_length=200,
     )
     solved = models.BooleanField(default=False)
     finished = models.BooleanField(default=False)
+    warm_start = models.BooleanField(default=False)
+    repair = models.BooleanField(default=False)
+    repair_of = models.ForeignKey(
+        "self", models.SET_NULL, null=True, blank=True, related_name="repairs"
+    )
+    repaired_courses = models.PositiveIntegerField(null=True, blank=True)
+    alternatives = models.PositiveIntegerField(
+        default=1, validators=[MinValueValidator(1), MaxValueValidator(10)]
+    )
+    alternative_of = models.ForeignKey(
+        "self",
+        models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="alternative_schedules",
+    )
+    warm_start_status = models.CharField(
+        max_length=20, choices=WARM_START_STATUSES, blank=True
+    )
+    problems = models.JSONField(default=list, blank=True)
+    conflicts = models.JSONField(default=list, blank=True)
+    optimal = models.BooleanField(default=False)
+    objective = models.FloatField(null=True, blank=True)
+    bound = models.FloatField(null=True, blank=True)
+    gap = models.FloatField(null=True, blank=True)
+    elapsed = models.FloatField(null=True, blank=True)
+    solver_backend = models.CharField(max_length=50, blank=True)
+    portfolio = models.JSONField(default=list, blank=True)
+    metrics = models.JSONField(default=dict, blank=True)
 
 
 class ScheduleItem(OrgData):
@@ -138,6 +191,17 @@ class ScheduleItem(OrgData):
     period_start = models.TimeField()
     period_end = models.TimeField()
     room_pk = models.PositiveIntegerField()
+    teacher_pk = models.PositiveIntegerField(null=True)
+    course_pk = models.PositiveIntegerField(null=True)
     room_name = models.CharField(max_length=200)
     teacher_name = models.CharField(max_length=200)
     course_name = models.CharField(max_length=150)
+
+
+class CachedSolution(OrgData):
+    key = models.CharField(max_length=64)
+    assignments = models.JSONField()
+    last_used = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("organization", "key")
@@ -0,0 +1,3 @@
+from courses.solver.model import create_model, get_possible_assignments
+from courses.solver.pipeline import solve
+from courses.solver.snapshot import Snapshot, load_snapshot
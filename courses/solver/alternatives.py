@@ -0,0 +1,97 @@
+import numpy as np
+import pyomo.environ as pe
+from django.conf import settings
+
+from courses.solver.decompose import solve_anchored
+from courses.solver.matrix import build_matrix
+from courses.solver.metrics import SolveMetrics
+from courses.solver.model import create_model, get_assignments
+from courses.solver.snapshot import Snapshot
+
+
+def add_placement_cut(pyomo_model: pe.ConcreteModel, changes=1):
+    chosen = [
+        assignment
+        for assignment, var in pyomo_model.assignments.items()
+        if var.value is not None and var.value > 0.5
+    ]
+    if len(chosen) < changes:
+        return False
+
+    placed = {(p, c) for p, t, r, c in chosen}
+    pyomo_model.alternative_cuts.add(
+        sum(
+            var
+            for (p, t, r, c), var in pyomo_model.assignments.items()
+            if (p, c) in placed
+        )
+        <= len(chosen) - changes
+    )
+    return True
+
+
+def solve_matrix_alternatives(snapshot: Snapshot, backend, count, metrics, progress):
+    with metrics.phase("build"):
+        matrix = build_matrix(snapshot, backend.symmetry_breaking)
+        session = backend.open_matrix(matrix)
+    metrics.add_model(matrix)
+
+    outcomes = []
+    while len(outcomes) < count and (not outcomes or progress.remaining > 0):
+        session.backend = progress.limit(session.backend)
+        with metrics.phase("solve"):
+            solver_result, x = session.solve(progress=None if outcomes else progress)
+        if not solver_result.has_solution:
+            break
+        outcomes.append((solver_result, matrix.get_assignments(x)))
+
+        cut = matrix.get_placement_cut(x, settings.SOLVER_ALTERNATIVE_CHANGES)
+        if cut is None:
+            break
+        columns, upper = cut
+        session.add_rows(
+            "alternative_cuts",
+            np.zeros(len(columns), dtype=np.int64),
+            columns,
+            np.ones(len(columns)),
+            [-np.inf],
+            [upper],
+            [len(outcomes)],
+        )
+    return outcomes or [(solver_result, [])]
+
+
+def solve_pyomo_alternatives(snapshot: Snapshot, backend, count, metrics, progress):
+    with metrics.phase("build"):
+        pyomo_model = create_model(snapshot, backend.symmetry_breaking)
+        pyomo_model.alternative_cuts = pe.ConstraintList()
+    metrics.add_model(pyomo_model)
+
+    outcomes = []
+    while len(outcomes) < count and (not outcomes or progress.remaining > 0):
+        with metrics.phase("solve"):
+            solver_result = progress.limit(backend).solve(pyomo_model)
+        if not solver_result.has_solution:
+            break
+        outcomes.append((solver_result, get_assignments(pyomo_model)))
+        if not add_placement_cut(pyomo_model, settings.SOLVER_ALTERNATIVE_CHANGES):
+            break
+    return outcomes or [(solver_result, [])]
+
+
+def solve_alternatives(snapshot: Snapshot, backend, count, progress):
+    metrics = SolveMetrics()
+    outcome = solve_anchored(snapshot)
+    if outcome is not None:
+        outcomes = [outcome]
+    elif backend.formulation == "heuristic":
+        with metrics.phase("solve"):
+            outcomes = [backend.solve_snapshot(snapshot)]
+    elif backend.formulation == "matrix":
+        outcomes = solve_matrix_alternatives(
+            snapshot, backend, count, metrics, progress
+        )
+    else:
+        outcomes = solve_pyomo_alternatives(snapshot, backend, count, metrics, progress)
+    outcomes[0][0].metrics = metrics
+    return outcomes
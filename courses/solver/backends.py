@@ -0,0 +1,397 @@
+import math
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pyomo.environ as pe
+import pyomo.opt as po
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+from pyomo.contrib import appsi
+
+from courses.solver.heuristic import find_schedule
+from courses.solver.metrics import SolveMetrics
+from courses.solver.model import get_objective
+
+OPTIMAL = "optimal"
+FEASIBLE = "feasible"
+INFEASIBLE = "infeasible"
+NO_SOLUTION = "no_solution"
+
+
+@dataclass
+class SolverResult:
+    status: str
+    termination: str
+    objective: Optional[float] = None
+    bound: Optional[float] = None
+    nodes: Optional[int] = None
+    metrics: Optional[SolveMetrics] = None
+
+    @property
+    def has_solution(self):
+        return self.status in (OPTIMAL, FEASIBLE)
+
+
+class SolverBackend:
+    formulation = "pyomo"
+    option_names = {}
+    integer_options = {}
+
+    def __init__(
+        self,
+        solver,
+        time_limit=None,
+        mip_gap=None,
+        threads=None,
+        tee=True,
+        solver_options=None,
+        symmetry_breaking=False,
+        two_stage=False,
+        heuristic_start=False,
+    ):
+        self.name = None
+        self.solver = solver
+        self.time_limit = time_limit
+        self.mip_gap = mip_gap
+        self.threads = threads
+        self.tee = tee
+        self.solver_options = solver_options or {}
+        self.symmetry_breaking = symmetry_breaking
+        self.two_stage = two_stage
+        self.heuristic_start = heuristic_start
+
+    def get_solver_options(self):
+        names = self.option_names.get(self.solver, {})
+        integers = self.integer_options.get(self.solver, set())
+        options = {
+            names[option]: math.ceil(value) if option in integers else value
+            for option, value in (
+                ("time_limit", self.time_limit),
+                ("mip_gap", self.mip_gap),
+                ("threads", self.threads),
+            )
+            if value is not None and option in names
+        }
+        options.update(self.solver_options)
+        return options
+
+    def supports_warm_start(self):
+        return False
+
+    def solve(self, pyomo_model: pe.ConcreteModel, warm_start=False) -> SolverResult:
+        raise NotImplementedError
+
+    def open_matrix(self, matrix):
+        return MatrixSession(self, matrix)
+
+    def solve_matrix(self, matrix, start=None, progress=None):
+        pyomo_model = matrix.to_pyomo()
+        if start is not None:
+            for j, value in enumerate(start.tolist()):
+                pyomo_model.x[j].set_value(value)
+
+        result = self.solve(pyomo_model, warm_start=start is not None)
+        if not result.has_solution:
+            return result, None
+        return result, np.array([pyomo_model.x[j].value or 0 for j in pyomo_model.x])
+
+
+class MatrixSession:
+    def __init__(self, backend, matrix):
+        self.backend = backend
+        self.matrix = matrix
+
+    def add_rows(self, name, rows, cols, values, lower, upper, labels):
+        self.matrix = self.matrix.with_rows(
+            name, rows, cols, values, lower, upper, labels
+        )
+
+    def solve(self, start=None, progress=None):
+        return self.backend.solve_matrix(self.matrix, start, progress)
+
+
+def get_legacy_result(pyomo_model, solver_results):
+    condition = solver_results.solver.termination_condition
+    if condition in (
+        po.TerminationCondition.infeasible,
+        po.TerminationCondition.infeasibleOrUnbounded,
+    ):
+        return SolverResult(INFEASIBLE, str(condition))
+    if not len(solver_results.solution):
+        return SolverResult(NO_SOLUTION, str(condition))
+
+    pyomo_model.solutions.load_from(solver_results)
+    optimal = (solver_results.solver.status == po.SolverStatus.ok) and (
+        condition == po.TerminationCondition.optimal
+    )
+    return SolverResult(
+        OPTIMAL if optimal else FEASIBLE,
+        str(condition),
+        objective=pe.value(pyomo_model.opt),
+        bound=solver_results.problem.lower_bound,
+    )
+
+
+class NeosBackend(SolverBackend):
+    def __init__(self, solver="minto", **kwargs):
+        super().__init__(solver, **kwargs)
+
+    def solve(self, pyomo_model, warm_start=False):
+        manager = po.SolverManagerFactory("neos")
+        solver_results = manager.solve(
+            pyomo_model,
+            tee=self.tee,
+            opt=self.solver,
+            options=self.get_solver_options(),
+            load_solutions=False,
+        )
+        return get_legacy_result(pyomo_model, solver_results)
+
+
+class PyomoBackend(SolverBackend):
+    option_names = {
+        "cbc": {"time_limit": "sec", "mip_gap": "ratioGap", "threads": "threads"},
+        "glpk": {"time_limit": "tmlim", "mip_gap": "mipgap"},
+        "gurobi": {
+            "time_limit": "TimeLimit",
+            "mip_gap": "MIPGap",
+            "threads": "Threads",
+        },
+        "cplex": {
+            "time_limit": "timelimit",
+            "mip_gap": "mip_tolerances_mipgap",
+            "threads": "threads",
+        },
+    }
+    integer_options = {"glpk": {"time_limit"}}
+
+    def get_solver(self):
+        solver = pe.SolverFactory(self.solver)
+        if not solver.available(exception_flag=False):
+            raise ValueError(f"Solver {self.solver} is not available")
+        return solver
+
+    def supports_warm_start(self):
+        return self.get_solver().warm_start_capable()
+
+    def solve(self, pyomo_model, warm_start=False):
+        solver_results = self.get_solver().solve(
+            pyomo_model,
+            tee=self.tee,
+            options=self.get_solver_options(),
+            load_solutions=False,
+            warmstart=warm_start,
+        )
+        return get_legacy_result(pyomo_model, solver_results)
+
+
+class AppsiBackend(SolverBackend):
+    solver_classes = {
+        "highs": "Highs",
+        "cbc": "Cbc",
+        "gurobi": "Gurobi",
+        "cplex": "Cplex",
+    }
+    option_names = {
+        "highs": {"threads": "threads"},
+        "cbc": {"threads": "threads"},
+        "gurobi": {"threads": "Threads"},
+        "cplex": {"threads": "threads"},
+    }
+
+    def get_solver(self):
+        solver_class = getattr(
+            appsi.solvers, self.solver_classes.get(self.solver, ""), None
+        )
+        if solver_class is None:
+            raise ImproperlyConfigured(
+                f"Appsi solver '{self.solver}' is not available in this Pyomo version"
+            )
+        solver = solver_class()
+        if not solver.available():
+            raise ValueError(f"Solver {self.solver} is not available")
+
+        solver.config.stream_solver = self.tee
+        solver.config.load_solution = False
+        solver.config.time_limit = self.time_limit
+        if self.mip_gap is not None and "mip_gap" in solver.config:
+            solver.config.mip_gap = self.mip_gap
+        setattr(solver, f"{self.solver}_options", self.get_solver_options())
+        return solver
+
+    def supports_warm_start(self):
+        return "warmstart" in self.get_solver().config
+
+    def solve(self, pyomo_model, warm_start=False):
+        solver = self.get_solver()
+        solver.config.warmstart = warm_start
+        results = solver.solve(pyomo_model)
+        condition = results.termination_condition
+        if condition in (
+            appsi.base.TerminationCondition.infeasible,
+            appsi.base.TerminationCondition.infeasibleOrUnbounded,
+        ):
+            return SolverResult(INFEASIBLE, condition.name)
+        if results.best_feasible_objective is None:
+            return SolverResult(NO_SOLUTION, condition.name)
+
+        results.solution_loader.load_vars()
+        optimal = condition == appsi.base.TerminationCondition.optimal
+        return SolverResult(
+            OPTIMAL if optimal else FEASIBLE,
+            condition.name,
+            objective=results.best_feasible_objective,
+            bound=results.best_objective_bound,
+        )
+
+
+class HighsBackend(SolverBackend):
+    formulation = "matrix"
+    option_names = {
+        "highs": {
+            "time_limit": "time_limit",
+            "mip_gap": "mip_rel_gap",
+            "threads": "threads",
+        }
+    }
+
+    def __init__(self, solver="highs", **kwargs):
+        super().__init__(solver, **kwargs)
+
+    def supports_warm_start(self):
+        return True
+
+    def get_solver(self):
+        try:
+            import highspy
+        except ImportError:
+            raise ValueError("Solver highs is not available")
+
+        solver = highspy.Highs()
+        solver.setOptionValue("output_flag", self.tee)
+        for option, value in self.get_solver_options().items():
+            solver.setOptionValue(option, value)
+        return solver
+
+    def open_matrix(self, matrix):
+        return HighsSession(self, matrix)
+
+    def solve_matrix(self, matrix, start=None, progress=None):
+        return self.open_matrix(matrix).solve(start, progress)
+
+
+class HighsSession(MatrixSession):
+    def __init__(self, backend, matrix):
+        import highspy
+
+        super().__init__(backend, matrix)
+        self.solver = backend.get_solver()
+        order = np.argsort(matrix.cols, kind="stable")
+        lp = highspy.HighsLp()
+        lp.num_col_ = matrix.num_cols
+        lp.num_row_ = matrix.num_rows
+        lp.col_cost_ = matrix.objective
+        lp.offset_ = matrix.objective_offset
+        lp.col_lower_ = matrix.col_lower
+        lp.col_upper_ = matrix.col_upper
+        lp.row_lower_ = matrix.row_lower
+        lp.row_upper_ = matrix.row_upper
+        lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        lp.a_matrix_.start_ = np.concatenate(
+            ([0], np.cumsum(np.bincount(matrix.cols, minlength=matrix.num_cols)))
+        )
+        lp.a_matrix_.index_ = matrix.rows[order]
+        lp.a_matrix_.value_ = matrix.values[order]
+        lp.integrality_ = [highspy.HighsVarType.kInteger] * matrix.num_cols
+        self.solver.passModel(lp)
+
+    def add_rows(self, name, rows, cols, values, lower, upper, labels):
+        super().add_rows(name, rows, cols, values, lower, upper, labels)
+        order = np.argsort(rows, kind="stable")
+        self.solver.addRows(
+            len(lower),
+            np.asarray(lower, dtype=float),
+            np.asarray(upper, dtype=float),
+            len(cols),
+            np.searchsorted(np.asarray(rows)[order], np.arange(len(lower))),
+            np.asarray(cols)[order],
+            np.asarray(values, dtype=float)[order],
+        )
+
+    def solve(self, start=None, progress=None):
+        import highspy
+
+        solver = self.solver
+        if self.backend.time_limit is not None:
+            solver.setOptionValue("time_limit", float(self.backend.time_limit))
+        if start is not None:
+            solution = highspy.HighsSolution()
+            solution.col_value = start
+            solution.value_valid = True
+            solver.setSolution(solution)
+        if progress is not None:
+
+            def report(event):
+                objective = event.data_out.objective_function_value
+                bound = event.data_out.mip_dual_bound
+                if np.isfinite(objective):
+                    progress.report(objective, bound if np.isfinite(bound) else None)
+
+            solver.cbMipImprovingSolution.subscribe(report)
+            solver.cbMipInterrupt.subscribe(report)
+
+        solver.run()
+        if progress is not None:
+            solver.cbMipImprovingSolution.clear()
+            solver.cbMipInterrupt.clear()
+        status = solver.getModelStatus()
+        info = solver.getInfo()
+        if status == highspy.HighsModelStatus.kInfeasible:
+            return SolverResult(INFEASIBLE, solver.modelStatusToString(status)), None
+        if (
+            info.primal_solution_status
+            != highspy.SolutionStatus.kSolutionStatusFeasible
+        ):
+            return SolverResult(NO_SOLUTION, solver.modelStatusToString(status)), None
+
+        optimal = status == highspy.HighsModelStatus.kOptimal
+        result = SolverResult(
+            OPTIMAL if optimal else FEASIBLE,
+            solver.modelStatusToString(status),
+            objective=info.objective_function_value,
+            bound=info.mip_dual_bound,
+            nodes=info.mip_node_count,
+        )
+        return result, np.asarray(solver.getSolution().col_value)
+
+
+class HeuristicBackend(SolverBackend):
+    formulation = "heuristic"
+
+    def __init__(self, solver="heuristic", **kwargs):
+        super().__init__(solver, **kwargs)
+
+    def solve_snapshot(self, snapshot):
+        assignments = find_schedule(snapshot, self.time_limit)
+        if assignments is None:
+            return SolverResult(NO_SOLUTION, "heuristic"), []
+
+        objective = get_objective(snapshot, assignments)
+        bound = get_objective(snapshot, [a.assignment for a in snapshot.anchors])
+        status = OPTIMAL if objective == bound else FEASIBLE
+        return SolverResult(status, "heuristic", objective, bound), assignments
+
+
+def get_backend(name=None):
+    name = name or settings.SOLVER_DEFAULT_BACKEND
+    try:
+        config = settings.SOLVER_BACKENDS[name]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown solver backend '{name}'")
+
+    backend_class = import_string(config["BACKEND"])
+    backend = backend_class(**{**settings.SOLVER_OPTIONS, **config.get("OPTIONS", {})})
+    backend.name = name
+    return backend
@@ -0,0 +1,124 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from courses import models
+from courses.solver import pipeline
+from courses.solver.decompose import get_components
+from courses.solver.instance import read_instance
+from courses.solver.metrics import (
+    SolveMetrics,
+    exclusive_peak_rss,
+    get_peak_rss_scope,
+    start_peak_rss,
+    stop_peak_rss,
+)
+from courses.solver.precheck import check_snapshot
+from courses.solver.presolve import presolve
+from courses.solver.progress import Progress
+from courses.solver.snapshot import load_snapshot
+
+PHASES = ("load", "precheck", "presolve", "decompose", "build", "solve", "write")
+
+
+class PhaseRecorder:
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        if self.trace_memory:
+            tracemalloc.start()
+        else:
+            start_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.trace_memory:
+                self.phases[name] = {"peak_memory": tracemalloc.get_traced_memory()[1]}
+                tracemalloc.stop()
+            else:
+                self.phases[name] = {
+                    "seconds": time.perf_counter() - start,
+                    "peak_rss": stop_peak_rss(),
+                    "peak_rss_scope": get_peak_rss_scope(),
+                }
+
+    def solve(self, components, backend):
+        progress = Progress(None, backend.time_limit)
+        if self.trace_memory:
+            with self.phase("solve"):
+                return pipeline.solve_components(
+                    components, backend, progress, processes=1
+                )
+
+        outcome = pipeline.solve_components(components, backend, progress, processes=1)
+        for name in ("build", "solve"):
+            self.phases[name] = outcome[0].metrics.phases.get(
+                name,
+                {"seconds": 0, "peak_rss": 0, "peak_rss_scope": get_peak_rss_scope()},
+            )
+        return outcome
+
+
+def run_phases(recorder, backend, org_pk=None, path=None):
+    with recorder.phase("load"):
+        snapshot = load_snapshot(org_pk) if path is None else read_instance(path)
+    with recorder.phase("precheck"):
+        problems = check_snapshot(snapshot)
+    metrics = SolveMetrics()
+    with recorder.phase("presolve"):
+        reduced = presolve(snapshot, metrics)
+    with recorder.phase("decompose"):
+        components = get_components(reduced)
+    solver_result, assignments, _ = recorder.solve(components, backend)
+
+    run = {
+        "organization": snapshot.org_pk,
+        "backend": backend.name,
+        "problems": problems,
+        "stats": {
+            "periods": len(snapshot.periods),
+            "teachers": len(snapshot.teachers),
+            "rooms": len(snapshot.rooms),
+            "courses": len(snapshot.courses),
+            "anchors": len(snapshot.anchors),
+            "mandatory_schedules": len(snapshot.mandatory_schedules),
+            "components": len(components),
+            "variables": solver_result.metrics.model["variables"],
+            "constraints": solver_result.metrics.model["constraints"],
+            "nonzeros": solver_result.metrics.model["nonzeros"],
+        },
+        "reductions": metrics.reductions,
+        "status": solver_result.status,
+        "objective": solver_result.objective,
+        "bound": solver_result.bound,
+    }
+
+    with recorder.phase("write"):
+        if solver_result.has_solution and path is None:
+            with transaction.atomic():
+                solved_schedule = models.SolvedSchedule.objects.create(
+                    organization_id=org_pk, name="Benchmark"
+                )
+                pipeline.save_solution(snapshot, solved_schedule, assignments)
+                transaction.set_rollback(True)
+
+    return run
+
+
+def run_benchmark(backend, org_pk=None, path=None, trace_memory=False):
+    timer = PhaseRecorder()
+    with exclusive_peak_rss():
+        run = run_phases(timer, backend, org_pk, path)
+    run["phases"] = {name: timer.phases[name] for name in PHASES}
+    if trace_memory:
+        tracer = PhaseRecorder(trace_memory=True)
+        run_phases(tracer, backend, org_pk, path)
+        for name, phase in tracer.phases.items():
+            run["phases"][name].update(phase)
+    return run
@@ -0,0 +1,58 @@
+import hashlib
+import json
+
+from django.conf import settings
+
+from courses import models
+from courses.solver.snapshot import Snapshot
+
+CACHE_VERSION = 1
+
+
+def get_cache_key(snapshot: Snapshot):
+    data = {
+        "version": CACHE_VERSION,
+        "periods": sorted([p.pk, p.avoid] for p in snapshot.periods),
+        "courses": sorted(
+            [
+                c.pk,
+                c.number_offered,
+                sorted(c.teachers),
+                sorted(c.rooms),
+                sorted(c.barred_periods),
+            ]
+            for c in snapshot.courses
+        ),
+        "anchors": sorted(list(a.assignment) for a in snapshot.anchors),
+        "mandatory_schedules": sorted(
+            sorted(ms.courses) for ms in snapshot.mandatory_schedules
+        ),
+    }
+    canonical = json.dumps(data, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def get_cached_assignments(org_pk: int, key: str):
+    entry = models.CachedSolution.objects.filter(organization=org_pk, key=key).first()
+    if entry is None:
+        return None
+
+    entry.save(update_fields=["last_used"])
+    return [tuple(assignment) for assignment in entry.assignments]
+
+
+def store_assignments(org_pk: int, key: str, assignments):
+    if settings.SOLUTION_CACHE_SIZE <= 0:
+        return
+
+    models.CachedSolution.objects.update_or_create(
+        organization_id=org_pk,
+        key=key,
+        defaults={"assignments": [list(assignment) for assignment in assignments]},
+    )
+    evicted = (
+        models.CachedSolution.objects.filter(organization=org_pk)
+        .order_by("-last_used")
+        .values_list("pk", flat=True)[settings.SOLUTION_CACHE_SIZE :]
+    )
+    models.CachedSolution.objects.filter(pk__in=list(evicted)).delete()
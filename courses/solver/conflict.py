@@ -0,0 +1,149 @@
+import logging
+from dataclasses import replace
+
+import numpy as np
+from django.conf import settings
+
+from courses.solver import backends
+from courses.solver.decompose import get_components
+from courses.solver.matrix import build_matrix
+from courses.solver.progress import Progress
+from courses.solver.snapshot import Snapshot
+
+ROW_RECORDS = {
+    "teacher_conflicts": lambda label: ("teacher", label[1]),
+    "room_conflicts": lambda label: ("room", label[1]),
+    "courses_offered": lambda label: ("course", label),
+    "anchored_courses": lambda label: ("anchored_course", label),
+    "mandatory_courses": lambda label: ("mandatory_schedule", label[0]),
+    "mandatory_periods": lambda label: ("mandatory_schedule", label[0]),
+    "mandatory_offered": lambda label: ("mandatory_schedule", label[0]),
+}
+RECORD_ORDER = ["course", "anchored_course", "mandatory_schedule", "teacher", "room"]
+
+
+def build_conflict_matrix(snapshot: Snapshot):
+    matrix = build_matrix(replace(snapshot, anchors=()))
+    columns = {a: j for j, a in enumerate(map(tuple, matrix.assignments.tolist()))}
+    if any(anchor.assignment not in columns for anchor in snapshot.anchors):
+        raise ValueError("Some anchored courses are not possible assignments")
+
+    num_anchors = len(snapshot.anchors)
+    matrix = matrix.with_rows(
+        "anchored_courses",
+        np.arange(num_anchors),
+        np.array([columns[a.assignment] for a in snapshot.anchors], dtype=np.int64),
+        np.ones(num_anchors),
+        np.ones(num_anchors),
+        np.ones(num_anchors),
+        [anchor.pk for anchor in snapshot.anchors],
+    )
+    return replace(matrix, objective=np.zeros(matrix.num_cols), objective_offset=0.0)
+
+
+def get_row_groups(matrix):
+    groups = {}
+    row_groups = np.zeros(matrix.num_rows, dtype=np.int64)
+    for name, start, labels in matrix.row_blocks:
+        if isinstance(labels, np.ndarray):
+            labels = labels.tolist()
+        for i, label in enumerate(labels):
+            record = ROW_RECORDS[name](label)
+            row_groups[start + i] = groups.setdefault(record, len(groups))
+    return list(groups), row_groups
+
+
+def select_rows(matrix, active):
+    rows = np.cumsum(active) - 1
+    keep = active[matrix.rows]
+    return replace(
+        matrix,
+        rows=rows[matrix.rows[keep]],
+        cols=matrix.cols[keep],
+        values=matrix.values[keep],
+        row_lower=matrix.row_lower[active],
+        row_upper=matrix.row_upper[active],
+        row_blocks=[],
+    )
+
+
+def filter_groups(is_infeasible, groups):
+    conflict = list(groups)
+    size = max(len(conflict) // 2, 1)
+    while True:
+        i = 0
+        while i < len(conflict):
+            trial = conflict[:i] + conflict[i + size :]
+            if trial and is_infeasible(trial):
+                conflict = trial
+            else:
+                i += size
+        if size == 1:
+            return conflict
+        size = max(size // 2, 1)
+
+
+def describe_record(snapshot: Snapshot, kind, pk):
+    if kind == "course":
+        course = snapshot.course_map[pk]
+        return course.name, (
+            f"{course.name} is offered {course.number_offered} times in its allowed "
+            f"periods, teachers and rooms"
+        )
+    if kind == "anchored_course":
+        anchor = next(a for a in snapshot.anchors if a.pk == pk)
+        course = snapshot.course_map[anchor.course]
+        return course.name, (
+            f"{course.name} is anchored with {snapshot.teacher_map[anchor.teacher].name}"
+            f" in {snapshot.room_map[anchor.room].name} during "
+            f"{snapshot.period_map[anchor.period].name}"
+        )
+    if kind == "mandatory_schedule":
+        schedule = next(ms for ms in snapshot.mandatory_schedules if ms.pk == pk)
+        return schedule.name, (
+            f"The courses of mandatory schedule {schedule.name} must be in different "
+            f"periods"
+        )
+    if kind == "teacher":
+        teacher = snapshot.teacher_map[pk]
+        return teacher.name, f"{teacher.name} can only teach one course per period"
+    room = snapshot.room_map[pk]
+    return room.name, f"{room.name} can only hold one course per period"
+
+
+def find_conflict(snapshot: Snapshot, backend, progress):
+    matrix = build_conflict_matrix(snapshot)
+    records, row_groups = get_row_groups(matrix)
+
+    def is_infeasible(groups):
+        if progress.remaining <= 0:
+            return False
+        active = np.isin(row_groups, groups)
+        solver_result, _ = progress.limit(backend).solve_matrix(
+            select_rows(matrix, active)
+        )
+        return solver_result.status == backends.INFEASIBLE
+
+    groups = list(range(len(records)))
+    if not is_infeasible(groups):
+        return None
+    return [records[g] for g in filter_groups(is_infeasible, groups)]
+
+
+def explain_infeasibility(snapshot: Snapshot):
+    backend = backends.get_backend(settings.SOLVER_CONFLICT_BACKEND)
+    backend.tee = False
+    progress = Progress(None, settings.SOLVER_CONFLICT_TIME_LIMIT)
+    for component in get_components(snapshot):
+        conflict = find_conflict(component, backend, progress)
+        if conflict is None:
+            continue
+        if progress.remaining <= 0:
+            logging.info("Conflict search ran out of time, it may not be minimal")
+
+        conflicts = []
+        for kind, pk in sorted(conflict, key=lambda r: (RECORD_ORDER.index(r[0]), r)):
+            name, reason = describe_record(component, kind, pk)
+            conflicts.append({"kind": kind, "pk": pk, "name": name, "reason": reason})
+        return conflicts
+    return []
@@ -0,0 +1,81 @@
+from collections import Counter, defaultdict
+
+from courses.solver import backends
+from courses.solver.matching import find_matching
+from courses.solver.metrics import SolveMetrics
+from courses.solver.snapshot import Snapshot
+
+
+def get_components(snapshot: Snapshot):
+    parents = {course.pk: course.pk for course in snapshot.courses}
+
+    def find(pk):
+        while parents[pk] != pk:
+            parents[pk] = parents[parents[pk]]
+            pk = parents[pk]
+        return pk
+
+    def union(pk1, pk2):
+        parents[find(pk1)] = find(pk2)
+
+    owners = {}
+    for course in snapshot.courses:
+        resources = [("teacher", t) for t in course.teachers]
+        resources += [("room", r) for r in course.rooms]
+        for resource in resources:
+            if resource in owners:
+                union(course.pk, owners[resource])
+            else:
+                owners[resource] = course.pk
+
+    for schedule in snapshot.mandatory_schedules:
+        courses = sorted(schedule.courses)
+        for course in courses[1:]:
+            union(courses[0], course)
+
+    components = {}
+    for course in snapshot.courses:
+        components.setdefault(find(course.pk), set()).add(course.pk)
+
+    return [snapshot.restrict(frozenset(courses)) for courses in components.values()]
+
+
+def solve_anchored(snapshot: Snapshot):
+    anchor_counts = Counter(anchor.course for anchor in snapshot.anchors)
+    if any(anchor_counts[c.pk] != c.number_offered for c in snapshot.courses):
+        return None
+
+    periods = defaultdict(set)
+    for anchor in snapshot.anchors:
+        periods[anchor.course].add(anchor.period)
+    for schedule in snapshot.mandatory_schedules:
+        adjacency = {c: sorted(periods[c]) for c in schedule.courses}
+        if len(find_matching(adjacency)) < len(adjacency):
+            return backends.SolverResult(backends.INFEASIBLE, "anchored"), []
+
+    objective = sum(a.period in snapshot.avoided_periods for a in snapshot.anchors)
+    return (
+        backends.SolverResult(backends.OPTIMAL, "anchored", objective, objective),
+        [anchor.assignment for anchor in snapshot.anchors],
+    )
+
+
+def merge_results(results):
+    statuses = {result.status for result in results}
+    for status in (backends.INFEASIBLE, backends.NO_SOLUTION, backends.FEASIBLE):
+        if status in statuses:
+            break
+    else:
+        status = backends.OPTIMAL
+
+    merged = backends.SolverResult(
+        status, ", ".join(sorted({result.termination for result in results}))
+    )
+    merged.metrics = SolveMetrics()
+    for result in results:
+        merged.metrics.merge(result.metrics)
+    if merged.has_solution:
+        merged.objective = sum(result.objective for result in results)
+        if all(result.bound is not None for result in results):
+            merged.bound = sum(result.bound for result in results)
+    return merged
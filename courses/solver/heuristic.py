@@ -0,0 +1,197 @@
+import random
+import time
+from collections import Counter, defaultdict, deque
+
+from courses.solver.matching import find_matching
+from courses.solver.model import get_free_assignments, group_assignments
+from courses.solver.snapshot import Snapshot
+
+HEURISTIC_SEED = 0
+HEURISTIC_START_TIME_LIMIT = 5
+EJECTIONS_PER_SECTION = 20
+
+
+class Schedule:
+    def __init__(self, snapshot: Snapshot, anchored_assignments):
+        self.snapshot = snapshot
+        self.fixed = set(anchored_assignments)
+        self.teacher_slots = {}
+        self.room_slots = {}
+        self.sections = defaultdict(set)
+        self.schedules = defaultdict(list)
+        for schedule in snapshot.mandatory_schedules:
+            for c in schedule.courses:
+                self.schedules[c].append(schedule)
+        for assignment in anchored_assignments:
+            self.add(assignment)
+
+    def add(self, assignment):
+        p, t, r, c = assignment
+        self.teacher_slots[p, t] = assignment
+        self.room_slots[p, r] = assignment
+        self.sections[c].add(assignment)
+
+    def remove(self, assignment):
+        p, t, r, c = assignment
+        del self.teacher_slots[p, t]
+        del self.room_slots[p, r]
+        self.sections[c].remove(assignment)
+
+    def get_blockers(self, assignment):
+        p, t, r, c = assignment
+        return {
+            blocker
+            for blocker in (self.teacher_slots.get((p, t)), self.room_slots.get((p, r)))
+            if blocker is not None
+        }
+
+    def get_ejections(self, assignment):
+        p = assignment[0]
+        mates = {d for s in self.schedules[assignment[3]] for d in s.courses}
+        mates.discard(assignment[3])
+        return self.get_blockers(assignment) | {
+            section for d in mates for section in self.sections[d] if section[0] == p
+        }
+
+    def get_periods(self, c):
+        course = self.snapshot.course_map[c]
+        if len(self.sections[c]) >= course.number_offered:
+            return sorted({p for p, t, r, c in self.sections[c]})
+        return [
+            p.pk for p in self.snapshot.periods if p.pk not in course.barred_periods
+        ]
+
+    def is_mandatory_feasible(self, courses):
+        for schedule in {s.pk: s for c in courses for s in self.schedules[c]}.values():
+            adjacency = {c: self.get_periods(c) for c in sorted(schedule.courses)}
+            if len(find_matching(adjacency)) < len(adjacency):
+                return False
+        return True
+
+    def try_add(self, assignment):
+        if self.get_blockers(assignment):
+            return False
+        self.add(assignment)
+        if self.is_mandatory_feasible([assignment[3]]):
+            return True
+        self.remove(assignment)
+        return False
+
+    def get_assignments(self):
+        return sorted(a for sections in self.sections.values() for a in sections)
+
+    def get_objective(self):
+        avoided = self.snapshot.avoided_periods
+        return sum(p in avoided for p, t, r, c in self.get_assignments())
+
+
+def get_candidates(snapshot: Snapshot, free_assignments, rng):
+    teacher_demand = Counter(t for c in snapshot.courses for t in c.teachers)
+    room_demand = Counter(r for c in snapshot.courses for r in c.rooms)
+    avoided = snapshot.avoided_periods
+    candidates = group_assignments(free_assignments, lambda p, t, r, c: c)
+    for c, assignments in candidates.items():
+        rng.shuffle(assignments)
+        assignments.sort(
+            key=lambda a: (a[0] in avoided, teacher_demand[a[1]] + room_demand[a[2]])
+        )
+    return candidates
+
+
+def place_sections(schedule: Schedule, candidates, rng):
+    snapshot = schedule.snapshot
+    missing = {
+        c.pk: c.number_offered - len(schedule.sections[c.pk]) for c in snapshot.courses
+    }
+    order = sorted(
+        (c for c in missing if missing[c] > 0),
+        key=lambda c: (
+            -len(schedule.schedules[c]),
+            len(candidates.get(c, ())) / missing[c],
+            rng.random(),
+        ),
+    )
+    queue = deque(c for c in order for _ in range(missing[c]))
+
+    ejected = Counter()
+    max_ejections = EJECTIONS_PER_SECTION * len(queue)
+    while queue:
+        c = queue.popleft()
+        if any(schedule.try_add(a) for a in candidates.get(c, ())):
+            continue
+        if sum(ejected.values()) >= max_ejections:
+            return False
+
+        options = []
+        for assignment in candidates.get(c, ()):
+            blockers = schedule.get_ejections(assignment)
+            if blockers and not blockers & schedule.fixed:
+                cost = sum(1 + ejected[blocker[3]] for blocker in blockers)
+                options.append((cost, rng.random(), assignment, blockers))
+        for _, _, assignment, blockers in sorted(options):
+            for blocker in blockers:
+                schedule.remove(blocker)
+            if schedule.try_add(assignment):
+                queue.extend(blocker[3] for blocker in blockers)
+                ejected.update(blocker[3] for blocker in blockers)
+                break
+            for blocker in blockers:
+                schedule.add(blocker)
+        else:
+            return False
+    return True
+
+
+def relocate(schedule: Schedule, assignment, candidates, periods):
+    for candidate in candidates[assignment[3]]:
+        if candidate[0] in periods and schedule.try_add(candidate):
+            return True
+    return False
+
+
+def improve(schedule: Schedule, candidates, deadline):
+    avoided = schedule.snapshot.avoided_periods
+    allowed = {p.pk for p in schedule.snapshot.periods} - avoided
+    improved = True
+    while improved and time.monotonic() < deadline:
+        improved = False
+        for assignment in schedule.get_assignments():
+            if time.monotonic() >= deadline:
+                break
+            if assignment[0] not in avoided or assignment in schedule.fixed:
+                continue
+
+            schedule.remove(assignment)
+            if relocate(schedule, assignment, candidates, allowed):
+                improved = True
+                continue
+
+            for candidate in candidates[assignment[3]]:
+                if candidate[0] not in allowed:
+                    continue
+                blockers = schedule.get_blockers(candidate)
+                if len(blockers) != 1 or blockers & schedule.fixed:
+                    continue
+                (blocker,) = blockers
+                schedule.remove(blocker)
+                if schedule.try_add(candidate):
+                    if relocate(schedule, blocker, candidates, allowed):
+                        improved = True
+                        break
+                    schedule.remove(candidate)
+                schedule.add(blocker)
+            else:
+                schedule.add(assignment)
+
+
+def find_schedule(snapshot: Snapshot, time_limit=None, seed=HEURISTIC_SEED):
+    deadline = time.monotonic() + (time_limit or HEURISTIC_START_TIME_LIMIT)
+    anchored_assignments, free_assignments = get_free_assignments(snapshot)
+    rng = random.Random(seed)
+    candidates = get_candidates(snapshot, free_assignments, rng)
+
+    schedule = Schedule(snapshot, anchored_assignments)
+    if not place_sections(schedule, candidates, rng):
+        return None
+    improve(schedule, candidates, deadline)
+    return schedule.get_assignments()
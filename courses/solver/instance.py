@@ -0,0 +1,106 @@
+import datetime
+import gzip
+import json
+
+from courses.solver.snapshot import (
+    AnchorData,
+    CourseData,
+    MandatoryScheduleData,
+    PeriodData,
+    RoomData,
+    Snapshot,
+    TeacherData,
+)
+
+INSTANCE_FORMAT = "course-scheduler-instance"
+INSTANCE_VERSION = 1
+
+
+def dump_snapshot(snapshot: Snapshot, anonymize=False):
+    def name(kind, item):
+        return f"{kind} {item.pk}" if anonymize else item.name
+
+    return {
+        "format": INSTANCE_FORMAT,
+        "version": INSTANCE_VERSION,
+        "organization": snapshot.org_pk,
+        "periods": [
+            [p.pk, p.number, p.start.isoformat(), p.end.isoformat(), p.avoid]
+            for p in snapshot.periods
+        ],
+        "teachers": [[t.pk, name("Teacher", t)] for t in snapshot.teachers],
+        "rooms": [[r.pk, name("Room", r)] for r in snapshot.rooms],
+        "courses": [
+            [
+                c.pk,
+                name("Course", c),
+                c.number_offered,
+                sorted(c.teachers),
+                sorted(c.rooms),
+                sorted(c.barred_periods),
+            ]
+            for c in snapshot.courses
+        ],
+        "anchors": [[a.pk, *a.assignment] for a in snapshot.anchors],
+        "mandatory_schedules": [
+            [ms.pk, name("Schedule", ms), sorted(ms.courses)]
+            for ms in snapshot.mandatory_schedules
+        ],
+    }
+
+
+def load_snapshot_data(data):
+    if data.get("format") != INSTANCE_FORMAT:
+        raise ValueError("Not a course scheduler instance")
+    if data.get("version") != INSTANCE_VERSION:
+        raise ValueError(f"Unsupported instance version {data.get('version')}")
+
+    return Snapshot(
+        org_pk=data["organization"],
+        periods=tuple(
+            PeriodData(
+                pk,
+                number,
+                datetime.time.fromisoformat(start),
+                datetime.time.fromisoformat(end),
+                avoid,
+            )
+            for pk, number, start, end, avoid in data["periods"]
+        ),
+        teachers=tuple(TeacherData(*values) for values in data["teachers"]),
+        rooms=tuple(RoomData(*values) for values in data["rooms"]),
+        courses=tuple(
+            CourseData(
+                pk,
+                name,
+                number_offered,
+                frozenset(teachers),
+                frozenset(rooms),
+                frozenset(barred_periods),
+            )
+            for pk, name, number_offered, teachers, rooms, barred_periods in data[
+                "courses"
+            ]
+        ),
+        anchors=tuple(AnchorData(*values) for values in data["anchors"]),
+        mandatory_schedules=tuple(
+            MandatoryScheduleData(pk, name, frozenset(courses))
+            for pk, name, courses in data["mandatory_schedules"]
+        ),
+    )
+
+
+def open_instance(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_instance(snapshot: Snapshot, path, anonymize=False):
+    with open_instance(path, "w") as f:
+        json.dump(dump_snapshot(snapshot, anonymize), f, separators=(",", ":"))
+
+
+def read_instance(path):
+    with open_instance(path, "r") as f:
+        return load_snapshot_data(json.load(f))
@@ -0,0 +1,37 @@
+def find_matching(adjacency):
+    left_matches = {}
+    right_matches = {}
+    for left, rights in adjacency.items():
+        for right in rights:
+            if right not in right_matches:
+                left_matches[left] = right
+                right_matches[right] = left
+                break
+
+    for root in adjacency:
+        if root in left_matches:
+            continue
+
+        parents = {}
+        stack = [root]
+        free_right = None
+        while stack and free_right is None:
+            left = stack.pop()
+            for right in adjacency[left]:
+                if right in parents:
+                    continue
+                parents[right] = left
+                if right not in right_matches:
+                    free_right = right
+                    break
+                stack.append(right_matches[right])
+
+        right = free_right
+        while right is not None:
+            left = parents[right]
+            previous_right = left_matches.get(left)
+            left_matches[left] = right
+            right_matches[right] = left
+            right = None if left == root else previous_right
+
+    return left_matches
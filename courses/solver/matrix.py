@@ -0,0 +1,479 @@
+from collections import defaultdict
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pyomo.environ as pe
+
+from courses.solver.matching import find_matching
+from courses.solver.snapshot import Snapshot
+from courses.solver.symmetry import get_ordered_pairs
+
+
+@dataclass
+class MatrixModel:
+    assignments: np.ndarray
+    anchored: np.ndarray
+    mandatory_slots: np.ndarray
+    objective: np.ndarray
+    objective_offset: float
+    col_lower: np.ndarray
+    col_upper: np.ndarray
+    rows: np.ndarray
+    cols: np.ndarray
+    values: np.ndarray
+    row_lower: np.ndarray
+    row_upper: np.ndarray
+    row_blocks: list
+
+    @property
+    def num_cols(self):
+        return len(self.objective)
+
+    @property
+    def num_rows(self):
+        return len(self.row_lower)
+
+    def get_activities(self, x):
+        return np.bincount(
+            self.rows, weights=self.values * x[self.cols], minlength=self.num_rows
+        )
+
+    def get_assignments(self, x):
+        chosen = x[: len(self.assignments)] > 0.5
+        return [
+            tuple(row)
+            for row in self.anchored.tolist() + self.assignments[chosen].tolist()
+        ]
+
+    def get_start(self, assignments):
+        x = np.zeros(self.num_cols)
+        columns = {
+            row: i for i, row in enumerate(map(tuple, self.assignments.tolist()))
+        }
+        assignments = [a for a in assignments if a in columns]
+        x[[columns[a] for a in assignments]] = 1
+
+        offered = {(a[0], a[-1]) for a in assignments + self.anchored.tolist()}
+        schedule_periods = defaultdict(lambda: defaultdict(list))
+        slot_columns = {}
+        for i, (s, p, c) in enumerate(self.mandatory_slots.tolist()):
+            slot_columns[s, p, c] = len(self.assignments) + i
+            if (p, c) in offered:
+                schedule_periods[s][c].append(p)
+        for s, adjacency in schedule_periods.items():
+            for c, p in find_matching(adjacency).items():
+                x[slot_columns[s, p, c]] = 1
+        return x
+
+    def with_rows(self, name, rows, cols, values, lower, upper, labels):
+        return replace(
+            self,
+            rows=np.concatenate((self.rows, np.asarray(rows) + self.num_rows)),
+            cols=np.concatenate((self.cols, cols)),
+            values=np.concatenate((self.values, values)),
+            row_lower=np.concatenate((self.row_lower, lower)),
+            row_upper=np.concatenate((self.row_upper, upper)),
+            row_blocks=self.row_blocks + [(name, self.num_rows, labels)],
+        )
+
+    def with_cutoff(self, value):
+        columns = np.flatnonzero(self.objective)
+        return self.with_rows(
+            "start_cutoff",
+            np.zeros(len(columns), dtype=np.int64),
+            columns,
+            self.objective[columns],
+            [-np.inf],
+            [value],
+            [()],
+        )
+
+    def get_placement_cut(self, x, changes=1):
+        chosen = x[: len(self.assignments)] > 0.5
+        if chosen.sum() < changes:
+            return None
+        slots = self.assignments[:, [0, -1]]
+        placed = {tuple(slot) for slot in slots[chosen].tolist()}
+        columns = np.array(
+            [j for j, slot in enumerate(slots.tolist()) if tuple(slot) in placed],
+            dtype=np.int64,
+        )
+        return columns, int(chosen.sum()) - changes
+
+    def to_pyomo(self):
+        order = np.argsort(self.rows, kind="stable")
+        row_starts = np.searchsorted(self.rows[order], np.arange(self.num_rows + 1))
+        cols, values = self.cols[order].tolist(), self.values[order].tolist()
+
+        def get_bound(value):
+            return value if np.isfinite(value) else None
+
+        def rule(m, i):
+            terms = range(row_starts[i], row_starts[i + 1])
+            if not terms:
+                if self.row_lower[i] <= 0 <= self.row_upper[i]:
+                    return pe.Constraint.Feasible
+                return pe.Constraint.Infeasible
+            return (
+                get_bound(self.row_lower[i]),
+                sum(values[k] * m.x[cols[k]] for k in terms),
+                get_bound(self.row_upper[i]),
+            )
+
+        pyomo_model = pe.ConcreteModel()
+        pyomo_model.x = pe.Var(
+            range(self.num_cols),
+            within=pe.Binary,
+            bounds=lambda m, j: (self.col_lower[j], self.col_upper[j]),
+        )
+        pyomo_model.opt = pe.Objective(
+            expr=self.objective_offset
+            + sum(
+                self.objective[j] * pyomo_model.x[j]
+                for j in np.flatnonzero(self.objective).tolist()
+            )
+        )
+        pyomo_model.rows = pe.Constraint(range(self.num_rows), rule=rule)
+        return pyomo_model
+
+    def is_feasible(self, x, tolerance=1e-6):
+        activities = self.get_activities(x)
+        return bool(
+            np.all(activities >= self.row_lower - tolerance)
+            and np.all(activities <= self.row_upper + tolerance)
+            and np.all(x >= self.col_lower - tolerance)
+            and np.all(x <= self.col_upper + tolerance)
+        )
+
+
+def get_index(pks):
+    return np.array(pks, dtype=np.int64), {pk: i for i, pk in enumerate(pks)}
+
+
+def get_mask(snapshot: Snapshot, index, attribute):
+    mask = np.zeros((len(snapshot.courses), len(index)), dtype=bool)
+    for i, course in enumerate(snapshot.courses):
+        mask[i, [index[pk] for pk in getattr(course, attribute)]] = True
+    return mask
+
+
+def group_product(keys_a, values_a, keys_b, values_b, num_keys):
+    order = np.argsort(keys_b, kind="stable")
+    values_b = values_b[order]
+    counts_b = np.bincount(keys_b, minlength=num_keys)
+    starts_b = np.cumsum(counts_b) - counts_b
+    repeats = counts_b[keys_a]
+    offsets = np.arange(repeats.sum()) - np.repeat(
+        np.cumsum(repeats) - repeats, repeats
+    )
+    return (
+        np.repeat(keys_a, repeats),
+        np.repeat(values_a, repeats),
+        values_b[np.repeat(starts_b[keys_a], repeats) + offsets],
+    )
+
+
+class RowBuilder:
+    def __init__(self):
+        self.blocks = []
+        self.row_blocks = []
+        self.row_lower = []
+        self.row_upper = []
+        self.num_rows = 0
+
+    def add_grouped(self, name, keys, columns, lower, upper, labels):
+        unique_keys, rows = np.unique(keys, return_inverse=True)
+        self.add(
+            name, rows.reshape(-1), columns, np.ones(len(columns)), labels(unique_keys)
+        )
+        self.row_lower.append(np.broadcast_to(lower, len(unique_keys)).astype(float))
+        self.row_upper.append(np.broadcast_to(upper, len(unique_keys)).astype(float))
+        return unique_keys
+
+    def add(self, name, rows, columns, values, labels):
+        self.blocks.append((rows + self.num_rows, columns, values))
+        self.row_blocks.append((name, self.num_rows, labels))
+        self.num_rows += len(labels)
+
+
+def add_order_rows(builder, name, pairs, period_index, resource_index, slot_keys):
+    pairs = np.array(pairs, dtype=np.int64).reshape(-1, 3)
+    num_keys = len(period_index) * len(resource_index)
+    p = np.array([period_index[pk] for pk in pairs[:, 0]], dtype=np.int64)
+    pair_rows = np.arange(len(pairs))
+    columns = np.arange(len(slot_keys))
+
+    parts = []
+    for position, sign in ((1, 1), (2, -1)):
+        x = np.array([resource_index[pk] for pk in pairs[:, position]], np.int64)
+        _, rows, pair_columns = group_product(
+            p * len(resource_index) + x, pair_rows, slot_keys, columns, num_keys
+        )
+        parts.append((rows, pair_columns, np.full(len(rows), sign, dtype=float)))
+
+    rows, pair_columns, values = (np.concatenate(part) for part in zip(*parts))
+    builder.add(name, rows, pair_columns, values, pairs)
+    builder.row_lower.append(np.zeros(len(pairs)))
+    builder.row_upper.append(np.full(len(pairs), np.inf))
+
+
+def add_room_capacity_rows(builder, period_pks, room_pks, room_mask, p, c, anchors):
+    room_sets = np.unique(room_mask[np.unique(c)], axis=0)
+    room_sets = np.unique(np.vstack((room_sets, room_sets.any(axis=0))), axis=0)
+    anchored_rooms = np.zeros((len(period_pks), len(room_pks)), dtype=bool)
+    anchored_rooms[anchors] = True
+    capacity = room_sets.sum(axis=1) - np.count_nonzero(
+        anchored_rooms[:, None, :] & room_sets[None], axis=2
+    )
+    subsets = ~np.any(room_mask[:, None, :] & ~room_sets[None], axis=2)
+
+    columns, set_index = np.nonzero(subsets[c])
+    keys = p[columns] * len(room_sets) + set_index
+    capacity = capacity.reshape(-1)
+    binding = (np.bincount(keys, minlength=len(capacity)) > capacity)[keys]
+    unique_keys, rows = np.unique(keys[binding], return_inverse=True)
+    builder.add(
+        "room_capacity",
+        rows.reshape(-1),
+        columns[binding],
+        np.ones(len(rows)),
+        [
+            (
+                period_pks[key // len(room_sets)],
+                tuple(room_pks[room_sets[key % len(room_sets)]].tolist()),
+            )
+            for key in unique_keys.tolist()
+        ],
+    )
+    builder.row_lower.append(np.full(len(unique_keys), -np.inf))
+    builder.row_upper.append(capacity[unique_keys].astype(float))
+
+
+def build_matrix(snapshot: Snapshot, symmetry_breaking=False, two_stage=False):
+    period_pks, period_index = get_index([p.pk for p in snapshot.periods])
+    teacher_pks, teacher_index = get_index([t.pk for t in snapshot.teachers])
+    room_pks, room_index = get_index([r.pk for r in snapshot.rooms])
+    course_pks, course_index = get_index([c.pk for c in snapshot.courses])
+    num_periods, num_teachers = len(period_pks), len(teacher_pks)
+    num_rooms, num_courses = len(room_pks), len(course_pks)
+
+    period_mask = ~get_mask(snapshot, period_index, "barred_periods")
+    teacher_mask = get_mask(snapshot, teacher_index, "teachers")
+    room_mask = get_mask(snapshot, room_index, "rooms")
+
+    c, p = np.nonzero(period_mask)
+    c, p, t = group_product(c, p, *np.nonzero(teacher_mask), num_courses)
+    c, pt, r = group_product(
+        c, p * num_teachers + t, *np.nonzero(room_mask), num_courses
+    )
+    p, t = np.divmod(pt, num_teachers)
+
+    anchor_p = np.array([period_index[a.period] for a in snapshot.anchors], np.int64)
+    anchor_t = np.array([teacher_index[a.teacher] for a in snapshot.anchors], np.int64)
+    anchor_r = np.array([room_index[a.room] for a in snapshot.anchors], np.int64)
+    anchor_c = np.array([course_index[a.course] for a in snapshot.anchors], np.int64)
+    codes = ((c * num_periods + p) * num_teachers + t) * num_rooms + r
+    anchor_codes = (
+        (anchor_c * num_periods + anchor_p) * num_teachers + anchor_t
+    ) * num_rooms + anchor_r
+    if not np.all(np.isin(anchor_codes, codes)):
+        raise ValueError("Some anchored courses are not possible assignments")
+
+    anchored_teachers = anchor_p * num_teachers + anchor_t
+    anchored_rooms = anchor_p * num_rooms + anchor_r
+    if len(np.unique(anchored_teachers)) < len(anchored_teachers) or len(
+        np.unique(anchored_rooms)
+    ) < len(anchored_rooms):
+        raise ValueError("Some anchored courses share a teacher or room in a period")
+
+    remaining = np.array([c.number_offered for c in snapshot.courses], dtype=float)
+    remaining -= np.bincount(anchor_c, minlength=num_courses)
+    if np.any(remaining < 0):
+        raise ValueError("Some courses are anchored more often than they are offered")
+
+    keep = (
+        ~np.isin(p * num_teachers + t, anchored_teachers)
+        & ~np.isin(p * num_rooms + r, anchored_rooms)
+        & (remaining[c] > 0)
+    )
+    p, t, r, c = p[keep], t[keep], r[keep], c[keep]
+    if two_stage:
+        codes = np.unique((c * num_periods + p) * num_teachers + t)
+        codes, t = np.divmod(codes, num_teachers)
+        c, p = np.divmod(codes, num_periods)
+    num_assignments = len(c)
+    columns = np.arange(num_assignments)
+    if np.any((np.bincount(c, minlength=num_courses) == 0) & (remaining > 0)):
+        raise ValueError("Some offered courses have no possible assignments")
+
+    builder = RowBuilder()
+    builder.add_grouped(
+        "teacher_conflicts",
+        p * num_teachers + t,
+        columns,
+        0,
+        1,
+        lambda keys: np.column_stack(
+            (period_pks[keys // num_teachers], teacher_pks[keys % num_teachers])
+        ),
+    )
+    if two_stage:
+        add_room_capacity_rows(
+            builder, period_pks, room_pks, room_mask, p, c, (anchor_p, anchor_r)
+        )
+    else:
+        builder.add_grouped(
+            "room_conflicts",
+            p * num_rooms + r,
+            columns,
+            0,
+            1,
+            lambda keys: np.column_stack(
+                (period_pks[keys // num_rooms], room_pks[keys % num_rooms])
+            ),
+        )
+    if symmetry_breaking:
+        add_order_rows(
+            builder,
+            "teacher_order",
+            get_ordered_pairs(snapshot, "teacher", "teachers"),
+            period_index,
+            teacher_index,
+            p * num_teachers + t,
+        )
+    if symmetry_breaking and not two_stage:
+        add_order_rows(
+            builder,
+            "room_order",
+            get_ordered_pairs(snapshot, "room", "rooms"),
+            period_index,
+            room_index,
+            p * num_rooms + r,
+        )
+
+    course_keys, course_rows = np.unique(c, return_inverse=True)
+    builder.add(
+        "courses_offered",
+        course_rows.reshape(-1),
+        columns,
+        np.ones(num_assignments),
+        course_pks[course_keys],
+    )
+    builder.row_lower.append(remaining[course_keys])
+    builder.row_upper.append(remaining[course_keys])
+
+    offered_slots = np.zeros((num_periods, num_courses), dtype=bool)
+    offered_slots[p, c] = True
+    offered_slots[anchor_p, anchor_c] = True
+    anchored_slots = np.zeros((num_periods, num_courses), dtype=bool)
+    anchored_slots[anchor_p, anchor_c] = True
+    slot_parts = []
+    for s, schedule in enumerate(snapshot.mandatory_schedules):
+        schedule_courses = np.array(
+            sorted(course_index[pk] for pk in schedule.courses), dtype=np.int64
+        )
+        schedule_slots = offered_slots[:, schedule_courses]
+        if not np.all(schedule_slots.any(axis=0)):
+            raise ValueError(
+                f"Mandatory schedule {schedule.name} has a course without possible "
+                f"assignments"
+            )
+        slot_periods, positions = np.nonzero(schedule_slots)
+        slot_parts.append(
+            np.column_stack(
+                (
+                    np.full(len(positions), s),
+                    slot_periods,
+                    schedule_courses[positions],
+                )
+            )
+        )
+    slots = np.concatenate(slot_parts) if slot_parts else np.zeros((0, 3), np.int64)
+    num_mandatory = len(slots)
+    mandatory_columns = num_assignments + np.arange(num_mandatory)
+    schedule_pks = np.array(
+        [ms.pk for ms in snapshot.mandatory_schedules], dtype=np.int64
+    )
+    s, slot_p, slot_c = slots.T
+
+    if num_mandatory:
+        builder.add_grouped(
+            "mandatory_courses",
+            s * num_courses + slot_c,
+            mandatory_columns,
+            1,
+            1,
+            lambda keys: np.column_stack(
+                (schedule_pks[keys // num_courses], course_pks[keys % num_courses])
+            ),
+        )
+        builder.add_grouped(
+            "mandatory_periods",
+            s * num_periods + slot_p,
+            mandatory_columns,
+            -np.inf,
+            1,
+            lambda keys: np.column_stack(
+                (schedule_pks[keys // num_periods], period_pks[keys % num_periods])
+            ),
+        )
+
+        free_slots = np.flatnonzero(~anchored_slots[slot_p, slot_c])
+        num_free = len(free_slots)
+        _, assignment_columns, rows = group_product(
+            p * num_courses + c,
+            columns,
+            slot_p[free_slots] * num_courses + slot_c[free_slots],
+            np.arange(num_free),
+            num_periods * num_courses,
+        )
+        builder.add(
+            "mandatory_offered",
+            np.concatenate((np.arange(num_free), rows)),
+            np.concatenate((mandatory_columns[free_slots], assignment_columns)),
+            np.concatenate((np.ones(num_free), -np.ones(len(rows)))),
+            np.column_stack(
+                (
+                    schedule_pks[s[free_slots]],
+                    period_pks[slot_p[free_slots]],
+                    course_pks[slot_c[free_slots]],
+                )
+            ),
+        )
+        builder.row_lower.append(np.full(num_free, -np.inf))
+        builder.row_upper.append(np.zeros(num_free))
+
+    avoided = np.array([period.avoid for period in snapshot.periods], dtype=bool)
+    objective = np.zeros(num_assignments + num_mandatory)
+    objective[:num_assignments] = avoided[p]
+
+    if two_stage:
+        assignments = (period_pks[p], teacher_pks[t], course_pks[c])
+        anchored = (period_pks[anchor_p], teacher_pks[anchor_t], course_pks[anchor_c])
+    else:
+        assignments = (period_pks[p], teacher_pks[t], room_pks[r], course_pks[c])
+        anchored = (
+            period_pks[anchor_p],
+            teacher_pks[anchor_t],
+            room_pks[anchor_r],
+            course_pks[anchor_c],
+        )
+
+    rows, cols, values = (np.concatenate(part) for part in zip(*builder.blocks))
+    return MatrixModel(
+        assignments=np.column_stack(assignments),
+        anchored=np.column_stack(anchored),
+        mandatory_slots=np.column_stack(
+            (schedule_pks[s], period_pks[slot_p], course_pks[slot_c])
+        ),
+        objective=objective,
+        objective_offset=float(avoided[anchor_p].sum()),
+        col_lower=np.zeros(num_assignments + num_mandatory),
+        col_upper=np.ones(num_assignments + num_mandatory),
+        rows=rows,
+        cols=cols,
+        values=values,
+        row_lower=np.concatenate(builder.row_lower),
+        row_upper=np.concatenate(builder.row_upper),
+        row_blocks=builder.row_blocks,
+    )
@@ -0,0 +1,182 @@
+import resource
+import threading
+import time
+from contextlib import contextmanager
+
+import pyomo.environ as pe
+from prometheus_client import Counter, Histogram
+from pyomo.core.expr.visitor import identify_variables
+
+PHASE_SECONDS = Histogram(
+    "courses_solver_phase_seconds",
+    "Time spent in each phase of a solve",
+    ["phase", "backend"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600, 1800, float("inf")),
+)
+PHASE_PEAK_RSS = Histogram(
+    "courses_solver_phase_peak_rss_bytes",
+    "Peak resident set size of the solving process during each phase, reset per "
+    "phase when the scope is phase and sampled at its start and end otherwise",
+    ["phase", "backend", "scope"],
+    buckets=tuple(2**power for power in range(24, 36)) + (float("inf"),),
+)
+MODEL_SIZE = Histogram(
+    "courses_solver_model_size",
+    "Number of variables, constraints and non-zeros of solved models",
+    ["dimension", "backend"],
+    buckets=(1e2, 1e3, 1e4, 1e5, 1e6, 1e7, float("inf")),
+)
+SOLVES = Counter(
+    "courses_solver_solves_total",
+    "Finished solves by backend and outcome",
+    ["backend", "status"],
+)
+
+
+open_peaks = threading.local()
+exclusive_process = threading.Event()
+
+
+def read_rss(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(f"{field}:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def reset_peak_rss():
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def get_peak_rss_scope():
+    return "phase" if exclusive_process.is_set() else "process"
+
+
+@contextmanager
+def exclusive_peak_rss():
+    exclusive_process.set()
+    try:
+        yield
+    finally:
+        exclusive_process.clear()
+
+
+def update_open_peaks():
+    peaks = getattr(open_peaks, "peaks", [])
+    peak = read_rss("VmHWM" if exclusive_process.is_set() else "VmRSS")
+    for i, open_peak in enumerate(peaks):
+        peaks[i] = max(open_peak, peak)
+    return peaks
+
+
+def start_peak_rss():
+    peaks = update_open_peaks()
+    if exclusive_process.is_set():
+        reset_peak_rss()
+    peaks.append(0)
+    open_peaks.peaks = peaks
+
+
+def stop_peak_rss():
+    return update_open_peaks().pop()
+
+
+def get_model_size(model):
+    if isinstance(model, pe.ConcreteModel):
+        constraints = list(
+            model.component_data_objects(pe.Constraint, active=True, descend_into=True)
+        )
+        return {
+            "variables": model.nvariables(),
+            "constraints": len(constraints),
+            "nonzeros": sum(
+                len(list(identify_variables(c.body, include_fixed=False)))
+                for c in constraints
+            ),
+        }
+    return {
+        "variables": model.num_cols,
+        "constraints": model.num_rows,
+        "nonzeros": len(model.values),
+    }
+
+
+class SolveMetrics:
+    def __init__(self):
+        self.phases = {}
+        self.model = {"components": 0, "variables": 0, "constraints": 0, "nonzeros": 0}
+        self.reductions = {}
+
+    @contextmanager
+    def phase(self, name):
+        start_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(
+                name,
+                time.perf_counter() - start,
+                stop_peak_rss(),
+                get_peak_rss_scope(),
+            )
+
+    def add_phase(self, name, seconds, peak_rss, peak_rss_scope):
+        phase = self.phases.setdefault(
+            name, {"seconds": 0, "peak_rss": 0, "peak_rss_scope": peak_rss_scope}
+        )
+        phase["seconds"] += seconds
+        phase["peak_rss"] = max(phase["peak_rss"], peak_rss)
+        if peak_rss_scope != phase["peak_rss_scope"]:
+            phase["peak_rss_scope"] = "process"
+
+    def add_reduction(self, name, before, after):
+        reduction = self.reductions.setdefault(name, {"before": 0, "after": 0})
+        reduction["before"] += before
+        reduction["after"] += after
+
+    def add_model(self, model):
+        self.model["components"] += 1
+        for dimension, value in get_model_size(model).items():
+            self.model[dimension] += value
+
+    def merge(self, other):
+        if other is None:
+            return
+        for name, phase in other.phases.items():
+            self.add_phase(name, **phase)
+        for dimension, value in other.model.items():
+            self.model[dimension] += value
+        for name, reduction in other.reductions.items():
+            self.add_reduction(name, **reduction)
+
+    def summary(self, backend, status):
+        return {
+            "backend": backend,
+            "status": status,
+            "phases": {
+                name: {**phase, "seconds": round(phase["seconds"], 4)}
+                for name, phase in self.phases.items()
+            },
+            "model": self.model,
+            "reductions": self.reductions,
+        }
+
+    def observe(self, backend, status):
+        for name, phase in self.phases.items():
+            PHASE_SECONDS.labels(name, backend).observe(phase["seconds"])
+            PHASE_PEAK_RSS.labels(name, backend, phase["peak_rss_scope"]).observe(
+                phase["peak_rss"]
+            )
+        if self.model["components"]:
+            for dimension in ("variables", "constraints", "nonzeros"):
+                MODEL_SIZE.labels(dimension, backend).observe(self.model[dimension])
+        SOLVES.labels(backend, status).inc()
@@ -0,0 +1,228 @@
+from collections import Counter, defaultdict
+
+import pyomo.environ as pe
+
+from courses.solver.matching import find_matching
+from courses.solver.snapshot import Snapshot
+from courses.solver.symmetry import get_ordered_pairs
+
+
+def get_possible_assignments(snapshot: Snapshot):
+    return [
+        (p.pk, t, r, c.pk)
+        for c in snapshot.courses
+        for p in snapshot.periods
+        if p.pk not in c.barred_periods
+        for t in sorted(c.teachers)
+        for r in sorted(c.rooms)
+    ]
+
+
+def get_free_assignments(snapshot: Snapshot):
+    anchored_assignments = sorted(anchor.assignment for anchor in snapshot.anchors)
+    possible_assignments = get_possible_assignments(snapshot)
+    impossible_anchors = set(anchored_assignments).difference(possible_assignments)
+    if impossible_anchors:
+        raise ValueError(
+            f"Anchored courses {sorted(impossible_anchors)} are not possible "
+            f"assignments for their course"
+        )
+
+    anchored_teachers = Counter((p, t) for p, t, r, c in anchored_assignments)
+    anchored_rooms = Counter((p, r) for p, t, r, c in anchored_assignments)
+    if any(n > 1 for n in [*anchored_teachers.values(), *anchored_rooms.values()]):
+        raise ValueError("Some anchored courses share a teacher or room in a period")
+
+    remaining = Counter({c.pk: c.number_offered for c in snapshot.courses})
+    remaining.subtract(c for p, t, r, c in anchored_assignments)
+    if any(n < 0 for n in remaining.values()):
+        raise ValueError("Some courses are anchored more often than they are offered")
+
+    return anchored_assignments, [
+        (p, t, r, c)
+        for p, t, r, c in possible_assignments
+        if remaining[c] > 0
+        and (p, t) not in anchored_teachers
+        and (p, r) not in anchored_rooms
+    ]
+
+
+def group_assignments(assignments, key):
+    groups = defaultdict(list)
+    for assignment in assignments:
+        groups[key(*assignment)].append(assignment)
+    return groups
+
+
+def get_courses_offered_constraint(course_slots):
+    def rule(m, c):
+        if not course_slots[c]:
+            if m.course_number_offered[c]:
+                return pe.Constraint.Infeasible
+            return pe.Constraint.Feasible
+        return sum(m.assignments[a] for a in course_slots[c]) == (
+            m.course_number_offered[c]
+        )
+
+    return rule
+
+
+def get_order_constraint(slots):
+    def rule(m, p, a, b):
+        if not slots[p, b]:
+            return pe.Constraint.Skip
+        return sum(m.assignments[x] for x in slots[p, a]) >= sum(
+            m.assignments[x] for x in slots[p, b]
+        )
+
+    return rule
+
+
+def get_mandatory_courses_constraint(schedule_course_slots):
+    def rule(m, s, c):
+        if not schedule_course_slots[s, c]:
+            return pe.Constraint.Infeasible
+        return sum(m.mandatory_choices[a] for a in schedule_course_slots[s, c]) == 1
+
+    return rule
+
+
+def create_model(snapshot: Snapshot, symmetry_breaking=False):
+    pyomo_model = pe.ConcreteModel()
+
+    pyomo_model.periods = pe.Set(initialize=[p.pk for p in snapshot.periods])
+    pyomo_model.teachers = pe.Set(initialize=[t.pk for t in snapshot.teachers])
+    pyomo_model.rooms = pe.Set(initialize=[r.pk for r in snapshot.rooms])
+    pyomo_model.courses = pe.Set(initialize=[c.pk for c in snapshot.courses])
+    pyomo_model.avoided_periods = pe.Set(initialize=sorted(snapshot.avoided_periods))
+
+    mandatory_schedules = {
+        ms.pk: sorted(ms.courses) for ms in snapshot.mandatory_schedules
+    }
+
+    anchored_assignments, possible_assignments = get_free_assignments(snapshot)
+    pyomo_model.anchored_assignments = pe.Set(dimen=4, initialize=anchored_assignments)
+    pyomo_model.possible_assignments = pe.Set(dimen=4, initialize=possible_assignments)
+    anchor_counts = Counter(c for p, t, r, c in anchored_assignments)
+    pyomo_model.course_number_offered = pe.Param(
+        pyomo_model.courses,
+        initialize={
+            c.pk: c.number_offered - anchor_counts[c.pk] for c in snapshot.courses
+        },
+    )
+    pyomo_model.assignments = pe.Var(pyomo_model.possible_assignments, within=pe.Binary)
+
+    avoided_periods = snapshot.avoided_periods
+    pyomo_model.opt = pe.Objective(
+        expr=sum(
+            pyomo_model.assignments[p, t, r, c]
+            for p, t, r, c in possible_assignments
+            if p in avoided_periods
+        )
+        + sum(p in avoided_periods for p, t, r, c in anchored_assignments)
+    )
+
+    teacher_slots = group_assignments(possible_assignments, lambda p, t, r, c: (p, t))
+    pyomo_model.teacher_conflicts = pe.Constraint(
+        list(teacher_slots),
+        rule=lambda m, p, t: sum(m.assignments[a] for a in teacher_slots[p, t]) <= 1,
+    )
+
+    room_slots = group_assignments(possible_assignments, lambda p, t, r, c: (p, r))
+    pyomo_model.room_conflicts = pe.Constraint(
+        list(room_slots),
+        rule=lambda m, p, r: sum(m.assignments[a] for a in room_slots[p, r]) <= 1,
+    )
+
+    if symmetry_breaking:
+        pyomo_model.teacher_order = pe.Constraint(
+            get_ordered_pairs(snapshot, "teacher", "teachers"),
+            rule=get_order_constraint(teacher_slots),
+        )
+        pyomo_model.room_order = pe.Constraint(
+            get_ordered_pairs(snapshot, "room", "rooms"),
+            rule=get_order_constraint(room_slots),
+        )
+
+    course_slots = group_assignments(possible_assignments, lambda p, t, r, c: c)
+    pyomo_model.courses_offered = pe.Constraint(
+        pyomo_model.courses, rule=get_courses_offered_constraint(course_slots)
+    )
+
+    period_course_slots = group_assignments(
+        possible_assignments, lambda p, t, r, c: (p, c)
+    )
+    anchored_slots = {(p, c) for p, t, r, c in anchored_assignments}
+    mandatory_slots = [
+        (s, p, c)
+        for s, schedule in mandatory_schedules.items()
+        for c in schedule
+        for p in pyomo_model.periods
+        if (p, c) in period_course_slots or (p, c) in anchored_slots
+    ]
+    pyomo_model.mandatory_slots = pe.Set(dimen=3, initialize=mandatory_slots)
+    pyomo_model.mandatory_choices = pe.Var(
+        pyomo_model.mandatory_slots, within=pe.Binary
+    )
+
+    schedule_course_slots = group_assignments(mandatory_slots, lambda s, p, c: (s, c))
+    pyomo_model.mandatory_courses = pe.Constraint(
+        [(s, c) for s, schedule in mandatory_schedules.items() for c in schedule],
+        rule=get_mandatory_courses_constraint(schedule_course_slots),
+    )
+
+    schedule_period_slots = group_assignments(mandatory_slots, lambda s, p, c: (s, p))
+    pyomo_model.mandatory_periods = pe.Constraint(
+        list(schedule_period_slots),
+        rule=lambda m, s, p: sum(
+            m.mandatory_choices[a] for a in schedule_period_slots[s, p]
+        )
+        <= 1,
+    )
+
+    pyomo_model.mandatory_offered = pe.Constraint(
+        [(s, p, c) for s, p, c in mandatory_slots if (p, c) not in anchored_slots],
+        rule=lambda m, s, p, c: m.mandatory_choices[s, p, c]
+        <= sum(m.assignments[a] for a in period_course_slots[p, c]),
+    )
+
+    return pyomo_model
+
+
+def get_assignments(pyomo_model: pe.ConcreteModel):
+    return list(pyomo_model.anchored_assignments) + [
+        assignment
+        for assignment, var in pyomo_model.assignments.items()
+        if var.value is not None and var.value > 0.5
+    ]
+
+
+def get_objective(snapshot: Snapshot, assignments):
+    return sum(p in snapshot.avoided_periods for p, t, r, c in assignments)
+
+
+def set_start(pyomo_model: pe.ConcreteModel, assignments):
+    assignments = set(assignments)
+    for assignment in pyomo_model.possible_assignments:
+        pyomo_model.assignments[assignment].set_value(int(assignment in assignments))
+
+    offered = {(p, c) for p, t, r, c in assignments}
+    offered.update((p, c) for p, t, r, c in pyomo_model.anchored_assignments)
+    schedule_periods = defaultdict(lambda: defaultdict(list))
+    for s, p, c in pyomo_model.mandatory_slots:
+        if (p, c) in offered:
+            schedule_periods[s][c].append(p)
+    matchings = {
+        s: find_matching(adjacency) for s, adjacency in schedule_periods.items()
+    }
+    for s, p, c in pyomo_model.mandatory_slots:
+        pyomo_model.mandatory_choices[s, p, c].set_value(
+            int(matchings.get(s, {}).get(c) == p)
+        )
+
+
+def is_feasible(pyomo_model: pe.ConcreteModel, tolerance=1e-6):
+    return all(
+        (constraint.lslack() >= -tolerance) and (constraint.uslack() >= -tolerance)
+        for constraint in pyomo_model.component_data_objects(pe.Constraint, active=True)
+    )
@@ -0,0 +1,224 @@
+import os
+import shutil
+import subprocess
+import tempfile
+
+import numpy as np
+
+from courses.solver.backends import (
+    FEASIBLE,
+    INFEASIBLE,
+    NO_SOLUTION,
+    OPTIMAL,
+    SolverBackend,
+    SolverResult,
+)
+from courses.solver.matrix import MatrixModel
+
+
+def format_value(value):
+    return f"{value:.12g}"
+
+
+def write_mps(matrix: MatrixModel, path):
+    finite_lower = np.isfinite(matrix.row_lower)
+    finite_upper = np.isfinite(matrix.row_upper)
+    equal = finite_lower & finite_upper & (matrix.row_lower == matrix.row_upper)
+    ranged = finite_lower & finite_upper & ~equal
+    row_types = np.where(equal, "E", np.where(finite_upper, "L", "G"))
+    rhs = np.where(row_types == "G", matrix.row_lower, matrix.row_upper)
+
+    order = np.argsort(matrix.cols, kind="stable")
+    rows, values = matrix.rows[order], matrix.values[order]
+    col_starts = np.searchsorted(matrix.cols[order], np.arange(matrix.num_cols + 1))
+
+    with open(path, "w") as f:
+        f.write("NAME SCHEDULE\nROWS\n N OBJ\n")
+        f.writelines(f" {row_type} r{i}\n" for i, row_type in enumerate(row_types))
+
+        f.write("COLUMNS\n MARKER 'MARKER' 'INTORG'\n")
+        for j in range(matrix.num_cols):
+            f.write(f" x{j} OBJ {format_value(matrix.objective[j])}\n")
+            f.writelines(
+                f" x{j} r{i} {format_value(value)}\n"
+                for i, value in zip(
+                    rows[col_starts[j] : col_starts[j + 1]].tolist(),
+                    values[col_starts[j] : col_starts[j + 1]].tolist(),
+                )
+            )
+        f.write(" MARKER 'MARKER' 'INTEND'\n")
+
+        f.write("RHS\n")
+        if matrix.objective_offset:
+            f.write(f" RHS OBJ {format_value(-matrix.objective_offset)}\n")
+        f.writelines(f" RHS r{i} {format_value(rhs[i])}\n" for i in np.flatnonzero(rhs))
+        if ranged.any():
+            f.write("RANGES\n")
+            f.writelines(
+                f" RNG r{i} "
+                f"{format_value(matrix.row_upper[i] - matrix.row_lower[i])}\n"
+                for i in np.flatnonzero(ranged)
+            )
+
+        f.write("BOUNDS\n")
+        for j in range(matrix.num_cols):
+            if matrix.col_lower[j] == matrix.col_upper[j]:
+                f.write(f" FX BND x{j} {format_value(matrix.col_lower[j])}\n")
+            else:
+                f.write(f" BV BND x{j}\n")
+        f.write("ENDATA\n")
+
+
+def read_cbc_solution(path, num_cols):
+    x = np.zeros(num_cols)
+    with open(path) as f:
+        termination = f.readline().strip()
+        for line in f:
+            fields = line.replace("**", "").split()
+            if len(fields) >= 3 and fields[1].startswith("x"):
+                x[int(fields[1][1:])] = float(fields[2])
+
+    objective = None
+    if "objective value" in termination:
+        objective = float(termination.split()[-1])
+    if termination.startswith("Optimal"):
+        status = OPTIMAL
+    elif termination.startswith("Infeasible"):
+        status = INFEASIBLE
+    elif objective is None or "no integer solution" in termination:
+        status = NO_SOLUTION
+    else:
+        status = FEASIBLE
+    return SolverResult(status, termination, objective=objective), x
+
+
+def read_glpk_solution(path, num_cols):
+    statuses = {"o": OPTIMAL, "f": FEASIBLE, "n": INFEASIBLE}
+    x = np.zeros(num_cols)
+    termination, objective = "", None
+    with open(path) as f:
+        for line in f:
+            fields = line.split()
+            if fields[:2] == ["s", "mip"]:
+                termination, objective = fields[4], float(fields[5])
+            elif fields[:1] == ["j"]:
+                x[int(fields[1]) - 1] = float(fields[2])
+
+    status = statuses.get(termination, NO_SOLUTION)
+    if status not in (OPTIMAL, FEASIBLE):
+        objective = None
+    return SolverResult(status, termination, objective=objective), x
+
+
+def read_highs_solution(path, num_cols):
+    x = np.zeros(num_cols)
+    termination, feasible, objective = "", False, None
+    with open(path) as f:
+        lines = iter(f.read().splitlines())
+    for line in lines:
+        if line == "Model status":
+            termination = next(lines)
+        elif line == "# Primal solution values":
+            feasible = next(lines) == "Feasible"
+        elif line.startswith("Objective") and feasible:
+            objective = float(line.split()[1])
+        elif line.startswith("# Columns") and feasible:
+            for _ in range(int(line.split()[2])):
+                name, value = next(lines).split()
+                x[int(name[1:])] = float(value)
+
+    if termination == "Optimal":
+        status = OPTIMAL
+    elif termination == "Infeasible":
+        status = INFEASIBLE
+    else:
+        status = FEASIBLE if feasible else NO_SOLUTION
+    return SolverResult(status, termination, objective=objective), x
+
+
+class MpsBackend(SolverBackend):
+    formulation = "matrix"
+    executables = {"cbc": "cbc", "glpk": "glpsol", "highs": "highs"}
+    option_names = {
+        "cbc": {"time_limit": "sec", "mip_gap": "ratioGap", "threads": "threads"},
+        "glpk": {"time_limit": "tmlim", "mip_gap": "mipgap"},
+        "highs": {
+            "time_limit": "time_limit",
+            "mip_gap": "mip_rel_gap",
+            "threads": "threads",
+        },
+    }
+    integer_options = {"glpk": {"time_limit"}}
+    readers = {
+        "cbc": read_cbc_solution,
+        "glpk": read_glpk_solution,
+        "highs": read_highs_solution,
+    }
+
+    def get_executable(self):
+        executable = shutil.which(self.executables.get(self.solver, self.solver))
+        if executable is None:
+            raise ValueError(f"Solver {self.solver} is not available")
+        return executable
+
+    def get_command(self, directory, model_path, solution_path):
+        executable = self.get_executable()
+        options = self.get_solver_options()
+        if self.solver == "cbc":
+            arguments = [a for n, v in options.items() for a in (f"-{n}", str(v))]
+            return [
+                executable,
+                model_path,
+                *arguments,
+                "-solve",
+                "-solu",
+                solution_path,
+            ]
+        if self.solver == "glpk":
+            arguments = [a for n, v in options.items() for a in (f"--{n}", str(v))]
+            return [
+                executable,
+                "--freemps",
+                model_path,
+                *arguments,
+                "-w",
+                solution_path,
+            ]
+
+        options_path = os.path.join(directory, "highs.opt")
+        with open(options_path, "w") as f:
+            f.writelines(f"{name} = {value}\n" for name, value in options.items())
+        return [
+            executable,
+            "--model_file",
+            model_path,
+            "--options_file",
+            options_path,
+            "--solution_file",
+            solution_path,
+        ]
+
+    def solve_matrix(self, matrix, start=None, progress=None):
+        with tempfile.TemporaryDirectory() as directory:
+            model_path = os.path.join(directory, "model.mps")
+            solution_path = os.path.join(directory, "solution.txt")
+            command = self.get_command(directory, model_path, solution_path)
+            write_mps(matrix, model_path)
+            completed = subprocess.run(
+                command,
+                stdout=None if self.tee else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                text=True,
+            )
+            if completed.returncode != 0:
+                raise ValueError(
+                    f"Solver {self.solver} exited with status "
+                    f"{completed.returncode}: {completed.stderr.strip()}"
+                )
+            if not os.path.exists(solution_path):
+                return SolverResult(NO_SOLUTION, "no solution file"), None
+            result, x = self.readers[self.solver](solution_path, matrix.num_cols)
+
+        if not result.has_solution:
+            return result, None
+        return result, x
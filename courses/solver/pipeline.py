@@ -0,0 +1,531 @@
+import itertools
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+import pyomo.environ as pe
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections, transaction
+
+from courses import models
+from courses.solver import backends, cache
+from courses.solver.alternatives import solve_alternatives
+from courses.solver.conflict import explain_infeasibility
+from courses.solver.decompose import get_components, merge_results, solve_anchored
+from courses.solver.heuristic import HEURISTIC_START_TIME_LIMIT, find_schedule
+from courses.solver.matrix import MatrixModel, build_matrix
+from courses.solver.metrics import SolveMetrics, exclusive_process
+from courses.solver.model import (
+    create_model,
+    get_assignments,
+    get_objective,
+    is_feasible,
+    set_start,
+)
+from courses.solver.portfolio import race
+from courses.solver.precheck import check_snapshot
+from courses.solver.presolve import presolve
+from courses.solver.progress import Progress, get_gap
+from courses.solver.repair import (
+    get_affected_courses,
+    get_repair_snapshot,
+    grow_affected_courses,
+)
+from courses.solver.snapshot import Snapshot, load_snapshot
+from courses.solver.symmetry import canonicalize
+from courses.solver.twostage import add_room_cuts, assign_rooms
+
+SCHEDULE_ITEM_BATCH_SIZE = 500
+TWO_STAGE_ROUNDS = 5
+
+
+def get_schedule_item(snapshot: Snapshot, solved_schedule, p, t, r, c):
+    period = snapshot.period_map[p]
+
+    return models.ScheduleItem(
+        organization_id=snapshot.org_pk,
+        solved_schedule=solved_schedule,
+        period_pk=period.pk,
+        period_number=period.number,
+        period_start=period.start,
+        period_end=period.end,
+        room_pk=r,
+        teacher_pk=t,
+        course_pk=c,
+        room_name=snapshot.room_map[r].name,
+        teacher_name=snapshot.teacher_map[t].name,
+        course_name=snapshot.course_map[c].name,
+    )
+
+
+def create_schedule_items(snapshot: Snapshot, solved_schedule, assignments):
+    models.ScheduleItem.objects.bulk_create(
+        [
+            get_schedule_item(snapshot, solved_schedule, p, t, r, c)
+            for p, t, r, c in assignments
+        ],
+        batch_size=SCHEDULE_ITEM_BATCH_SIZE,
+    )
+
+
+def save_solution(snapshot: Snapshot, solved_schedule, assignments, optimal=True):
+    with transaction.atomic():
+        create_schedule_items(snapshot, solved_schedule, assignments)
+        solved_schedule.solved = True
+        solved_schedule.optimal = optimal
+        solved_schedule.finished = True
+        solved_schedule.save()
+
+
+def get_previous_schedule(solved_schedule):
+    return (
+        models.SolvedSchedule.objects.filter(
+            organization=solved_schedule.organization_id, solved=True
+        )
+        .exclude(pk=solved_schedule.pk)
+        .order_by("-pk")
+        .first()
+    )
+
+
+def get_schedule_assignments(solved_schedule):
+    if solved_schedule is None:
+        return []
+
+    return list(
+        models.ScheduleItem.objects.filter(
+            solved_schedule=solved_schedule,
+            teacher_pk__isnull=False,
+            course_pk__isnull=False,
+        ).values_list("period_pk", "teacher_pk", "room_pk", "course_pk")
+    )
+
+
+def get_previous_assignments(solved_schedule):
+    return get_schedule_assignments(get_previous_schedule(solved_schedule))
+
+
+def apply_warm_start(pyomo_model, backend, previous_assignments):
+    set_start(pyomo_model, previous_assignments)
+    if not is_feasible(pyomo_model):
+        return models.SolvedSchedule.WARM_START_INFEASIBLE
+    if backend.supports_warm_start():
+        return models.SolvedSchedule.WARM_START_ACCEPTED
+
+    pyomo_model.start_cutoff = pe.Constraint(
+        expr=pyomo_model.opt.expr <= pe.value(pyomo_model.opt)
+    )
+    return models.SolvedSchedule.WARM_START_CUTOFF
+
+
+def solve_matrix(
+    matrix: MatrixModel, backend, previous_assignments=None, progress=None
+):
+    start = None
+    warm_start_status = ""
+    if previous_assignments:
+        start = matrix.get_start(previous_assignments)
+        if not matrix.is_feasible(start):
+            warm_start_status = models.SolvedSchedule.WARM_START_INFEASIBLE
+            start = None
+        elif backend.supports_warm_start():
+            warm_start_status = models.SolvedSchedule.WARM_START_ACCEPTED
+        else:
+            warm_start_status = models.SolvedSchedule.WARM_START_CUTOFF
+            matrix = matrix.with_cutoff(matrix.objective @ start)
+            start = None
+
+    solver_result, x = backend.solve_matrix(matrix, start, progress)
+    assignments = matrix.get_assignments(x) if solver_result.has_solution else []
+    return solver_result, assignments, warm_start_status
+
+
+def solve_two_stage_snapshot(
+    snapshot: Snapshot,
+    backend,
+    metrics,
+    previous_assignments=None,
+    progress=None,
+    matrix=None,
+):
+    if matrix is None:
+        with metrics.phase("build"):
+            matrix = build_matrix(snapshot, backend.symmetry_breaking, two_stage=True)
+        metrics.add_model(matrix)
+    previous_assignments = [(p, t, c) for p, t, r, c in previous_assignments or []]
+    for _ in range(TWO_STAGE_ROUNDS):
+        if progress is not None:
+            if progress.remaining <= 0:
+                return None
+            backend = progress.limit(backend)
+        with metrics.phase("solve"):
+            solver_result, period_assignments, warm_start_status = solve_matrix(
+                matrix, backend, previous_assignments, progress
+            )
+        if not solver_result.has_solution:
+            return solver_result, [], warm_start_status
+
+        with metrics.phase("solve"):
+            assignments, deficient = assign_rooms(snapshot, period_assignments)
+        if not deficient:
+            return solver_result, assignments, warm_start_status
+        matrix = add_room_cuts(snapshot, matrix, deficient)
+
+
+def solve_model(snapshot: Snapshot, backend, metrics, previous_assignments, progress):
+    if backend.formulation == "heuristic":
+        with metrics.phase("solve"):
+            solver_result, assignments = backend.solve_snapshot(snapshot)
+        return solver_result, assignments, ""
+
+    if backend.two_stage:
+        outcome = solve_two_stage_snapshot(
+            snapshot, backend, metrics, previous_assignments, progress
+        )
+        if outcome is not None:
+            return outcome
+        logging.info("Room matching failed, solving the full model instead")
+
+    if backend.formulation == "matrix":
+        with metrics.phase("build"):
+            matrix = build_matrix(snapshot, backend.symmetry_breaking)
+        metrics.add_model(matrix)
+        with metrics.phase("solve"):
+            return solve_matrix(matrix, backend, previous_assignments, progress)
+
+    with metrics.phase("build"):
+        pyomo_model = create_model(snapshot, backend.symmetry_breaking)
+    metrics.add_model(pyomo_model)
+    with metrics.phase("solve"):
+        warm_start_status = ""
+        if previous_assignments:
+            warm_start_status = apply_warm_start(
+                pyomo_model, backend, previous_assignments
+            )
+
+        solver_result = backend.solve(
+            pyomo_model,
+            warm_start=warm_start_status == models.SolvedSchedule.WARM_START_ACCEPTED,
+        )
+        assignments = get_assignments(pyomo_model) if solver_result.has_solution else []
+    return solver_result, assignments, warm_start_status
+
+
+def solve_snapshot(
+    snapshot: Snapshot, backend, previous_assignments=None, progress=None
+):
+    metrics = SolveMetrics()
+    outcome = solve_anchored(snapshot)
+    if outcome is not None:
+        solver_result, assignments = outcome
+        solver_result.metrics = metrics
+        return solver_result, assignments, ""
+
+    heuristic_start = (
+        backend.heuristic_start
+        and backend.formulation != "heuristic"
+        and not previous_assignments
+    )
+    if heuristic_start:
+        with metrics.phase("heuristic"):
+            previous_assignments = find_schedule(snapshot, HEURISTIC_START_TIME_LIMIT)
+    if previous_assignments and backend.symmetry_breaking:
+        previous_assignments = canonicalize(snapshot, previous_assignments)
+    solver_result, assignments, warm_start_status = solve_model(
+        snapshot, backend, metrics, previous_assignments, progress
+    )
+    if heuristic_start:
+        warm_start_status = ""
+    solver_result.metrics = metrics
+    return solver_result, assignments, warm_start_status
+
+
+def init_component_worker():
+    django.setup()
+    exclusive_process.set()
+
+
+def solve_components(
+    components, backend, progress, previous_assignments=None, processes=None
+):
+    if not components:
+        return merge_results([]), [], ""
+    if processes is None:
+        processes = settings.SOLVER_PROCESSES
+    component_assignments = [
+        [a for a in previous_assignments or [] if a[3] in component.course_map]
+        for component in components
+    ]
+    if processes <= 1 or len(components) <= 1:
+        outcomes = []
+        for component, assignments in zip(components, component_assignments):
+            outcomes.append(
+                solve_snapshot(
+                    component, progress.limit(backend), assignments, progress
+                )
+            )
+            progress.finish_component(outcomes[-1][0])
+    else:
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=processes, initializer=init_component_worker
+        ) as executor:
+            futures = [
+                executor.submit(
+                    solve_snapshot, component, progress.limit(backend), assignments
+                )
+                for component, assignments in zip(components, component_assignments)
+            ]
+            for future in as_completed(futures):
+                progress.finish_component(future.result()[0])
+                progress.report(0, 0)
+            outcomes = [future.result() for future in futures]
+
+    results, assignments, warm_start_statuses = zip(*outcomes)
+    warm_start_status = ""
+    for status in (
+        models.SolvedSchedule.WARM_START_INFEASIBLE,
+        models.SolvedSchedule.WARM_START_CUTOFF,
+        models.SolvedSchedule.WARM_START_ACCEPTED,
+    ):
+        if status in warm_start_statuses:
+            warm_start_status = status
+            break
+
+    return (
+        merge_results(results),
+        list(itertools.chain.from_iterable(assignments)),
+        warm_start_status,
+    )
+
+
+def solve_component_alternatives(components, backend, progress, count):
+    if not components:
+        return [(merge_results([]), [])]
+    component_outcomes = []
+    for component in components:
+        component_outcomes.append(
+            solve_alternatives(component, progress.limit(backend), count, progress)
+        )
+        progress.finish_component(component_outcomes[-1][0][0])
+
+    alternatives = []
+    for k in range(max(len(outcomes) for outcomes in component_outcomes)):
+        results, assignments = zip(
+            *(outcomes[min(k, len(outcomes) - 1)] for outcomes in component_outcomes)
+        )
+        alternatives.append(
+            (merge_results(results), list(itertools.chain.from_iterable(assignments)))
+        )
+    return alternatives
+
+
+def save_alternatives(snapshot: Snapshot, solved_schedule, alternatives):
+    for i, (solver_result, assignments) in enumerate(alternatives, 2):
+        alternative = models.SolvedSchedule.objects.create(
+            organization_id=solved_schedule.organization_id,
+            name=f"{solved_schedule.name} ({i})",
+            alternative_of=solved_schedule,
+            solver_backend=solved_schedule.solver_backend,
+            objective=solver_result.objective,
+            bound=solver_result.bound,
+            gap=get_gap(solver_result.objective, solver_result.bound),
+            elapsed=solved_schedule.elapsed,
+        )
+        optimal = (
+            solver_result.status == backends.OPTIMAL
+            and solved_schedule.optimal
+            and solver_result.objective <= solved_schedule.objective + 1e-6
+        )
+        save_solution(snapshot, alternative, assignments, optimal)
+
+
+def solve_repair(snapshot: Snapshot, backend, progress, base_assignments):
+    affected = get_affected_courses(snapshot, base_assignments)
+    while True:
+        complete = len(affected) == len(snapshot.courses)
+        repair_snapshot = get_repair_snapshot(snapshot, base_assignments, affected)
+        try:
+            outcome = solve_components(
+                get_components(repair_snapshot), backend, progress, base_assignments
+            )
+        except ValueError:
+            if complete:
+                raise
+            outcome = None
+        if complete or (outcome is not None and outcome[0].has_solution):
+            return outcome, len(affected)
+
+        grown = grow_affected_courses(snapshot, affected)
+        if grown == affected:
+            grown = set(snapshot.course_map)
+        logging.info(
+            f"Repair of {len(affected)} courses failed, retrying with {len(grown)}"
+        )
+        affected = grown
+
+
+def solve_variant(name, components, time_limit, previous_assignments=None):
+    start = time.monotonic()
+    try:
+        outcome = solve_components(
+            components,
+            backends.get_backend(name),
+            Progress(None, time_limit),
+            previous_assignments,
+            processes=1,
+        )
+    except ValueError as e:
+        outcome = e
+    return name, outcome, time.monotonic() - start
+
+
+def record_metrics(solved_schedule, metrics, backend_name, status):
+    metrics.observe(backend_name, status)
+    solved_schedule.metrics = metrics.summary(backend_name, status)
+    models.SolvedSchedule.objects.filter(pk=solved_schedule.pk).update(
+        metrics=solved_schedule.metrics
+    )
+
+
+def solve(org_pk: int, solved_schedule_pk: int):
+    try:
+        solved_schedule = models.SolvedSchedule.objects.get(pk=solved_schedule_pk)
+        models.ScheduleItem.objects.filter(solved_schedule=solved_schedule).delete()
+    except models.SolvedSchedule.DoesNotExist:
+        return
+
+    metrics = SolveMetrics()
+    with metrics.phase("load"):
+        snapshot = load_snapshot(org_pk)
+        cache_key = cache.get_cache_key(snapshot)
+        cached_assignments = None
+        if solved_schedule.alternatives <= 1 and not solved_schedule.repair:
+            cached_assignments = cache.get_cached_assignments(org_pk, cache_key)
+    if cached_assignments is not None:
+        solved_schedule.objective = get_objective(snapshot, cached_assignments)
+        solved_schedule.bound = solved_schedule.objective
+        solved_schedule.gap = 0.0
+        with metrics.phase("write"):
+            save_solution(snapshot, solved_schedule, cached_assignments)
+        record_metrics(solved_schedule, metrics, "cache", "cached")
+        return solved_schedule.pk
+
+    with metrics.phase("precheck"):
+        solved_schedule.problems = check_snapshot(snapshot)
+    if solved_schedule.problems:
+        solved_schedule.finished = True
+        solved_schedule.save()
+        record_metrics(solved_schedule, metrics, "precheck", "problems")
+        return solved_schedule.pk
+    with metrics.phase("presolve"):
+        reduced = presolve(snapshot, metrics)
+
+    backend_name = models.Organization.objects.values_list(
+        "solver_backend", flat=True
+    ).get(pk=org_pk)
+    try:
+        backend = backends.get_backend(backend_name)
+    except (ImportError, ImproperlyConfigured) as e:
+        logging.error(f"Solved schedule {solved_schedule_pk} failed. ERROR: {e}")
+        solved_schedule.problems = [str(e)]
+        solved_schedule.finished = True
+        solved_schedule.save()
+        record_metrics(
+            solved_schedule,
+            metrics,
+            backend_name or settings.SOLVER_DEFAULT_BACKEND,
+            "error",
+        )
+        return solved_schedule.pk
+    progress = Progress(solved_schedule.pk, backend.time_limit)
+    previous_assignments = None
+    if solved_schedule.repair:
+        if solved_schedule.repair_of is None:
+            solved_schedule.repair_of = get_previous_schedule(solved_schedule)
+        previous_assignments = get_schedule_assignments(solved_schedule.repair_of)
+    elif solved_schedule.warm_start:
+        previous_assignments = get_previous_assignments(solved_schedule)
+        if not previous_assignments:
+            solved_schedule.warm_start_status = (
+                models.SolvedSchedule.WARM_START_UNAVAILABLE
+            )
+
+    repairing = bool(previous_assignments) and solved_schedule.repair
+    components = get_components(reduced)
+    alternatives = []
+    try:
+        if solved_schedule.alternatives > 1:
+            solved_schedule.solver_backend = backend.name
+            (solver_result, assignments), *alternatives = solve_component_alternatives(
+                components, backend, progress, solved_schedule.alternatives
+            )
+            warm_start_status = ""
+        elif repairing:
+            solved_schedule.solver_backend = backend.name
+            outcome, solved_schedule.repaired_courses = solve_repair(
+                reduced, backend, progress, previous_assignments
+            )
+            solver_result, assignments, _ = outcome
+            warm_start_status = ""
+        elif settings.SOLVER_PORTFOLIO and not backend_name:
+            (solved_schedule.solver_backend, outcome), solved_schedule.portfolio = race(
+                settings.SOLVER_PORTFOLIO,
+                solve_variant,
+                (components, backend.time_limit, previous_assignments),
+                backend.time_limit,
+            )
+            solver_result, assignments, warm_start_status = outcome
+        else:
+            solved_schedule.solver_backend = backend.name
+            solver_result, assignments, warm_start_status = solve_components(
+                components, backend, progress, previous_assignments
+            )
+    except (ImproperlyConfigured, ValueError) as e:
+        logging.error(f"Solved schedule {solved_schedule_pk} failed. ERROR: {e}")
+        solved_schedule.problems = [str(e)]
+        solved_schedule.finished = True
+        solved_schedule.save()
+        record_metrics(solved_schedule, metrics, backend.name, "error")
+        return solved_schedule.pk
+
+    metrics.merge(solver_result.metrics)
+    if warm_start_status:
+        solved_schedule.warm_start_status = warm_start_status
+    solved_schedule.objective = solver_result.objective
+    solved_schedule.bound = solver_result.bound
+    solved_schedule.gap = get_gap(solver_result.objective, solver_result.bound)
+    solved_schedule.elapsed = progress.elapsed
+    if solver_result.has_solution:
+        optimal = solver_result.status == backends.OPTIMAL and not repairing
+        with metrics.phase("write"):
+            if optimal:
+                cache.store_assignments(org_pk, cache_key, assignments)
+            save_solution(snapshot, solved_schedule, assignments, optimal)
+        with metrics.phase("write"):
+            save_alternatives(snapshot, solved_schedule, alternatives)
+    else:
+        if (
+            solver_result.status == backends.INFEASIBLE
+            and settings.SOLVER_CONFLICT_TIME_LIMIT > 0
+        ):
+            with metrics.phase("explain"):
+                try:
+                    solved_schedule.conflicts = explain_infeasibility(snapshot)
+                except (ImportError, ImproperlyConfigured, ValueError) as e:
+                    logging.error(
+                        f"Explaining solved schedule {solved_schedule_pk} failed. "
+                        f"ERROR: {e}"
+                    )
+                    solved_schedule.conflicts = []
+        solved_schedule.finished = True
+        solved_schedule.save()
+    record_metrics(
+        solved_schedule,
+        metrics,
+        solved_schedule.solver_backend or backend.name,
+        solver_result.status,
+    )
+    return solved_schedule.pk
@@ -0,0 +1,103 @@
+import multiprocessing
+import os
+import queue
+import signal
+import time
+
+import django
+from django.db import connections
+
+from courses.solver import backends
+from courses.solver.metrics import exclusive_process
+
+PORTFOLIO_GRACE = 30
+
+
+def get_record(name, outcome, seconds):
+    if isinstance(outcome, Exception):
+        return {"name": name, "status": "error", "error": str(outcome)}
+    solver_result = outcome[0]
+    return {
+        "name": name,
+        "status": solver_result.status,
+        "objective": solver_result.objective,
+        "bound": solver_result.bound,
+        "seconds": round(seconds, 3),
+    }
+
+
+def pick_winner(finished):
+    solved = [
+        (name, outcome)
+        for name, outcome, seconds in finished
+        if not isinstance(outcome, Exception) and outcome[0].has_solution
+    ]
+    for name, outcome in solved:
+        if outcome[0].status == backends.OPTIMAL:
+            return name, outcome
+    if solved:
+        return min(solved, key=lambda item: item[1][0].objective)
+
+    for name, outcome, seconds in finished:
+        if not isinstance(outcome, Exception):
+            return name, outcome
+    if finished:
+        error = finished[0][1]
+        raise error if isinstance(error, ValueError) else ValueError(str(error))
+    return "", (backends.SolverResult(backends.NO_SOLUTION, "deadline"), [], "")
+
+
+def init_worker():
+    os.setpgrp()
+    django.setup()
+    exclusive_process.set()
+
+
+def kill_workers(pool):
+    process_groups = [process.pid for process in pool._pool]
+    pool.terminate()
+    for process_group in process_groups:
+        try:
+            os.killpg(process_group, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def race(names, function, arguments, time_limit):
+    finished = queue.Queue()
+    connections.close_all()
+    pool = multiprocessing.Pool(len(names), initializer=init_worker)
+    try:
+        for name in names:
+            pool.apply_async(
+                function,
+                (name, *arguments),
+                callback=finished.put,
+                error_callback=lambda e, name=name: finished.put((name, e, 0)),
+            )
+
+        deadline = time.monotonic() + time_limit + PORTFOLIO_GRACE
+        results = []
+        while len(results) < len(names):
+            try:
+                name, outcome, seconds = finished.get(
+                    timeout=max(deadline - time.monotonic(), 0)
+                )
+            except queue.Empty:
+                break
+            results.append((name, outcome, seconds))
+            if (
+                not isinstance(outcome, Exception)
+                and outcome[0].status == backends.OPTIMAL
+            ):
+                break
+    finally:
+        kill_workers(pool)
+
+    records = [get_record(*result) for result in results]
+    records += [
+        {"name": name, "status": "cancelled"}
+        for name in names
+        if name not in {record["name"] for record in records}
+    ]
+    return pick_winner(results), records
@@ -0,0 +1,163 @@
+from collections import Counter, defaultdict
+
+from courses.solver.matching import find_matching
+from courses.solver.snapshot import Snapshot
+
+
+def get_allowed_periods(snapshot: Snapshot, course):
+    return [p.pk for p in snapshot.periods if p.pk not in course.barred_periods]
+
+
+def check_courses(snapshot: Snapshot):
+    problems = []
+    for course in snapshot.courses:
+        if not course.number_offered:
+            continue
+        periods = get_allowed_periods(snapshot, course)
+        if not course.teachers:
+            problems.append(f"{course.name} has no teachers")
+        if not course.rooms:
+            problems.append(f"{course.name} has no rooms")
+        if not periods:
+            problems.append(f"{course.name} is barred from every period")
+
+        capacity = len(periods) * min(len(course.teachers), len(course.rooms))
+        if capacity and course.number_offered > capacity:
+            problems.append(
+                f"{course.name} is offered {course.number_offered} times but its "
+                f"periods, teachers and rooms allow at most {capacity} sections"
+            )
+    return problems
+
+
+def check_anchors(snapshot: Snapshot):
+    problems = []
+    anchor_counts = Counter(anchor.course for anchor in snapshot.anchors)
+    for course_pk, count in anchor_counts.items():
+        course = snapshot.course_map[course_pk]
+        if count > course.number_offered:
+            problems.append(
+                f"{course.name} is anchored {count} times but only offered "
+                f"{course.number_offered} times"
+            )
+
+    for anchor in snapshot.anchors:
+        course = snapshot.course_map[anchor.course]
+        period = snapshot.period_map[anchor.period]
+        if anchor.period in course.barred_periods:
+            problems.append(f"{course.name} is anchored in its barred {period.name}")
+        if anchor.teacher not in course.teachers:
+            problems.append(
+                f"{course.name} is anchored with "
+                f"{snapshot.teacher_map[anchor.teacher].name} who does not teach it"
+            )
+        if anchor.room not in course.rooms:
+            problems.append(
+                f"{course.name} is anchored in {snapshot.room_map[anchor.room].name} "
+                f"which is not one of its rooms"
+            )
+
+    teacher_slots = Counter((a.period, a.teacher) for a in snapshot.anchors)
+    for (p, t), count in teacher_slots.items():
+        if count > 1:
+            problems.append(
+                f"{snapshot.teacher_map[t].name} is anchored to {count} courses "
+                f"in {snapshot.period_map[p].name}"
+            )
+    room_slots = Counter((a.period, a.room) for a in snapshot.anchors)
+    for (p, r), count in room_slots.items():
+        if count > 1:
+            problems.append(
+                f"{snapshot.room_map[r].name} is anchored to {count} courses "
+                f"in {snapshot.period_map[p].name}"
+            )
+    return problems
+
+
+def check_mandatory_schedules(snapshot: Snapshot):
+    problems = []
+    anchored_periods = defaultdict(set)
+    anchor_counts = Counter()
+    for anchor in snapshot.anchors:
+        anchored_periods[anchor.course].add(anchor.period)
+        anchor_counts[anchor.course] += 1
+
+    for schedule in snapshot.mandatory_schedules:
+        if len(schedule.courses) > len(snapshot.periods):
+            problems.append(
+                f"Mandatory schedule {schedule.name} has {len(schedule.courses)} "
+                f"courses but there are only {len(snapshot.periods)} periods"
+            )
+            continue
+
+        adjacency = {}
+        for course_pk in sorted(schedule.courses):
+            course = snapshot.course_map[course_pk]
+            if not course.number_offered:
+                problems.append(
+                    f"Mandatory schedule {schedule.name} contains {course.name} "
+                    f"which is not offered"
+                )
+            if anchor_counts[course_pk] >= course.number_offered:
+                adjacency[course_pk] = sorted(anchored_periods[course_pk])
+            else:
+                adjacency[course_pk] = get_allowed_periods(snapshot, course)
+
+        if len(find_matching(adjacency)) < len(adjacency):
+            problems.append(
+                f"The courses of mandatory schedule {schedule.name} cannot all be "
+                f"placed in different periods"
+            )
+    return problems
+
+
+def check_resource_capacity(snapshot: Snapshot, resource, resource_map, plural):
+    anchored_slots = {(a.period, getattr(a, resource)) for a in snapshot.anchors}
+    anchor_counts = Counter(anchor.course for anchor in snapshot.anchors)
+
+    sections = {}
+    exclusive_demand = Counter()
+    for course in snapshot.courses:
+        resources = getattr(course, plural)
+        slots = [
+            (p, x)
+            for p in get_allowed_periods(snapshot, course)
+            for x in sorted(resources)
+            if (p, x) not in anchored_slots
+        ]
+        remaining = course.number_offered - anchor_counts[course.pk]
+        for i in range(remaining):
+            sections[course.pk, i] = slots
+        if len(resources) == 1:
+            exclusive_demand[next(iter(resources))] += max(remaining, 0)
+
+    problems = []
+    for x, demand in exclusive_demand.items():
+        free_periods = sum((p.pk, x) not in anchored_slots for p in snapshot.periods)
+        if demand > free_periods:
+            problems.append(
+                f"{resource_map[x].name} is the only option for {demand} unanchored "
+                f"sections but has only {free_periods} free periods"
+            )
+
+    if not problems:
+        matched = len(find_matching(sections))
+        if matched < len(sections):
+            problems.append(
+                f"The {plural} can cover at most {matched} of the "
+                f"{len(sections)} unanchored sections in distinct periods"
+            )
+    return problems
+
+
+def check_snapshot(snapshot: Snapshot):
+    problems = check_courses(snapshot) + check_anchors(snapshot)
+    problems += check_mandatory_schedules(snapshot)
+    if not problems:
+        problems += check_resource_capacity(
+            snapshot, "teacher", snapshot.teacher_map, "teachers"
+        )
+        problems += check_resource_capacity(
+            snapshot, "room", snapshot.room_map, "rooms"
+        )
+    return problems
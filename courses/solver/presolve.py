@@ -0,0 +1,139 @@
+from collections import defaultdict
+from dataclasses import replace
+
+from courses.solver.metrics import SolveMetrics
+from courses.solver.snapshot import AnchorData, Snapshot
+
+
+def collapse_mandatory_schedules(snapshot: Snapshot):
+    kept = set()
+    containing = defaultdict(list)
+    for schedule in sorted(
+        snapshot.mandatory_schedules, key=lambda ms: (-len(ms.courses), ms.pk)
+    ):
+        if not schedule.courses:
+            continue
+        course = min(schedule.courses, key=lambda c: len(containing[c]))
+        if any(schedule.courses <= other for other in containing[course]):
+            continue
+        kept.add(schedule.pk)
+        for c in schedule.courses:
+            containing[c].append(schedule.courses)
+
+    return replace(
+        snapshot,
+        mandatory_schedules=tuple(
+            ms for ms in snapshot.mandatory_schedules if ms.pk in kept
+        ),
+    )
+
+
+def get_domains(snapshot: Snapshot):
+    teacher_slots = {(a.period, a.teacher) for a in snapshot.anchors}
+    room_slots = {(a.period, a.room) for a in snapshot.anchors}
+    course_anchors = defaultdict(list)
+    for anchor in snapshot.anchors:
+        course_anchors[anchor.course].append(anchor)
+
+    domains = {}
+    for course in snapshot.courses:
+        anchors = course_anchors[course.pk]
+        domain = {}
+        if course.number_offered > len(anchors):
+            for period in snapshot.periods:
+                if period.pk in course.barred_periods:
+                    continue
+                teachers = sorted(
+                    t for t in course.teachers if (period.pk, t) not in teacher_slots
+                )
+                rooms = sorted(
+                    r for r in course.rooms if (period.pk, r) not in room_slots
+                )
+                if teachers and rooms:
+                    domain[period.pk] = teachers, rooms
+        domains[course.pk] = anchors, domain
+    return domains
+
+
+def count_free_assignments(snapshot: Snapshot):
+    return sum(
+        len(teachers) * len(rooms)
+        for _, domain in get_domains(snapshot).values()
+        for teachers, rooms in domain.values()
+    )
+
+
+def reduce_domains(snapshot: Snapshot):
+    while True:
+        domains = get_domains(snapshot)
+        teacher_slots = {(a.period, a.teacher) for a in snapshot.anchors}
+        room_slots = {(a.period, a.room) for a in snapshot.anchors}
+        courses = []
+        fixed = []
+        for course in snapshot.courses:
+            anchors, domain = domains[course.pk]
+            remaining = course.number_offered - len(anchors)
+            capacity = sum(min(len(t), len(r)) for t, r in domain.values())
+            if capacity < remaining:
+                courses.append(course)
+                continue
+
+            anchored_periods = {a.period for a in anchors}
+            courses.append(
+                replace(
+                    course,
+                    teachers=frozenset(
+                        [a.teacher for a in anchors]
+                        + [t for teachers, _ in domain.values() for t in teachers]
+                    ),
+                    rooms=frozenset(
+                        [a.room for a in anchors]
+                        + [r for _, rooms in domain.values() for r in rooms]
+                    ),
+                    barred_periods=frozenset(
+                        p.pk
+                        for p in snapshot.periods
+                        if p.pk not in domain and p.pk not in anchored_periods
+                    ),
+                )
+            )
+
+            forced = [
+                AnchorData(None, p, teachers[0], rooms[0], course.pk)
+                for p, (teachers, rooms) in domain.items()
+            ]
+            if (
+                remaining
+                and len(domain) == remaining
+                and all(len(t) == len(r) == 1 for t, r in domain.values())
+                and not any(
+                    (a.period, a.teacher) in teacher_slots
+                    or (a.period, a.room) in room_slots
+                    for a in forced
+                )
+            ):
+                fixed += forced
+                teacher_slots.update((a.period, a.teacher) for a in forced)
+                room_slots.update((a.period, a.room) for a in forced)
+
+        reduced = replace(
+            snapshot, courses=tuple(courses), anchors=snapshot.anchors + tuple(fixed)
+        )
+        if reduced == snapshot:
+            return reduced
+        snapshot = reduced
+
+
+def presolve(snapshot: Snapshot, metrics: SolveMetrics):
+    reduced = collapse_mandatory_schedules(snapshot)
+    metrics.add_reduction(
+        "mandatory_schedules",
+        len(snapshot.mandatory_schedules),
+        len(reduced.mandatory_schedules),
+    )
+
+    assignments = count_free_assignments(reduced)
+    reduced = reduce_domains(reduced)
+    metrics.add_reduction("assignments", assignments, count_free_assignments(reduced))
+    metrics.add_reduction("anchors", len(snapshot.anchors), len(reduced.anchors))
+    return reduced
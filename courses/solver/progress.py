@@ -0,0 +1,64 @@
+import copy
+import time
+
+from django.conf import settings
+
+from courses import models
+
+
+def get_gap(objective, bound):
+    if objective is None or bound is None:
+        return None
+    return abs(objective - bound) / max(abs(objective), 1)
+
+
+class Progress:
+    def __init__(self, solved_schedule_pk, time_limit=None):
+        self.solved_schedule_pk = solved_schedule_pk
+        self.time_limit = time_limit
+        self.start = time.monotonic()
+        self.last_report = None
+        self.finished_objective = 0
+        self.finished_bound = 0
+
+    @property
+    def elapsed(self):
+        return time.monotonic() - self.start
+
+    @property
+    def remaining(self):
+        if self.time_limit is None:
+            return float("inf")
+        return self.time_limit - self.elapsed
+
+    def limit(self, backend):
+        if self.time_limit is None:
+            return backend
+        backend = copy.copy(backend)
+        backend.time_limit = max(self.remaining, 1)
+        return backend
+
+    def report(self, objective, bound):
+        now = time.monotonic()
+        if self.solved_schedule_pk is None or (
+            self.last_report is not None
+            and now - self.last_report < settings.SOLVER_PROGRESS_INTERVAL
+        ):
+            return
+        self.last_report = now
+
+        objective += self.finished_objective
+        if bound is not None:
+            bound += self.finished_bound
+        models.SolvedSchedule.objects.filter(pk=self.solved_schedule_pk).update(
+            objective=objective,
+            bound=bound,
+            gap=get_gap(objective, bound),
+            elapsed=self.elapsed,
+        )
+
+    def finish_component(self, result):
+        if result.has_solution:
+            self.finished_objective += result.objective
+        if result.bound is not None:
+            self.finished_bound += result.bound
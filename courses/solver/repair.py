@@ -0,0 +1,73 @@
+from collections import Counter, defaultdict
+from dataclasses import replace
+
+from courses.solver.matching import find_matching
+from courses.solver.snapshot import AnchorData, Snapshot
+
+
+def is_valid(snapshot: Snapshot, assignment):
+    p, t, r, c = assignment
+    course = snapshot.course_map.get(c)
+    return (
+        course is not None
+        and p in snapshot.period_map
+        and p not in course.barred_periods
+        and t in course.teachers
+        and r in course.rooms
+    )
+
+
+def get_affected_courses(snapshot: Snapshot, base_assignments):
+    assignments = [a for a in base_assignments if is_valid(snapshot, a)]
+    affected = {a[3] for a in base_assignments if not is_valid(snapshot, a)}
+
+    counts = Counter(a[3] for a in assignments)
+    affected |= {c.pk for c in snapshot.courses if counts[c.pk] != c.number_offered}
+
+    kept = set(assignments)
+    teacher_slots = {(p, t): c for p, t, r, c in assignments}
+    room_slots = {(p, r): c for p, t, r, c in assignments}
+    for anchor in snapshot.anchors:
+        if anchor.assignment in kept:
+            continue
+        affected.add(anchor.course)
+        for owner in (
+            teacher_slots.get((anchor.period, anchor.teacher)),
+            room_slots.get((anchor.period, anchor.room)),
+        ):
+            if owner is not None:
+                affected.add(owner)
+
+    periods = defaultdict(set)
+    for p, t, r, c in assignments:
+        periods[c].add(p)
+    for schedule in snapshot.mandatory_schedules:
+        adjacency = {c: sorted(periods[c]) for c in schedule.courses}
+        if len(find_matching(adjacency)) < len(adjacency):
+            affected |= schedule.courses
+    return affected & set(snapshot.course_map)
+
+
+def grow_affected_courses(snapshot: Snapshot, affected):
+    teachers = set().union(*(snapshot.course_map[c].teachers for c in affected))
+    rooms = set().union(*(snapshot.course_map[c].rooms for c in affected))
+    grown = set(affected)
+    for course in snapshot.courses:
+        if course.teachers & teachers or course.rooms & rooms:
+            grown.add(course.pk)
+    for schedule in snapshot.mandatory_schedules:
+        if schedule.courses & affected:
+            grown |= schedule.courses
+    return grown
+
+
+def get_repair_snapshot(snapshot: Snapshot, base_assignments, affected):
+    anchored = {anchor.assignment for anchor in snapshot.anchors}
+    fixed = tuple(
+        AnchorData(None, *assignment)
+        for assignment in sorted(set(base_assignments))
+        if assignment[3] not in affected
+        and assignment not in anchored
+        and is_valid(snapshot, assignment)
+    )
+    return replace(snapshot, anchors=snapshot.anchors + fixed)
@@ -0,0 +1,192 @@
+import datetime
+from dataclasses import dataclass, replace
+from functools import cached_property
+
+from courses import models
+
+
+@dataclass(frozen=True)
+class PeriodData:
+    pk: int
+    number: int
+    start: datetime.time
+    end: datetime.time
+    avoid: bool
+
+    @property
+    def name(self):
+        return f"Period {self.number}"
+
+
+@dataclass(frozen=True)
+class TeacherData:
+    pk: int
+    name: str
+
+
+@dataclass(frozen=True)
+class RoomData:
+    pk: int
+    name: str
+
+
+@dataclass(frozen=True)
+class CourseData:
+    pk: int
+    name: str
+    number_offered: int
+    teachers: frozenset
+    rooms: frozenset
+    barred_periods: frozenset
+
+
+@dataclass(frozen=True)
+class AnchorData:
+    pk: int
+    period: int
+    teacher: int
+    room: int
+    course: int
+
+    @property
+    def assignment(self):
+        return self.period, self.teacher, self.room, self.course
+
+
+@dataclass(frozen=True)
+class MandatoryScheduleData:
+    pk: int
+    name: str
+    courses: frozenset
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    org_pk: int
+    periods: tuple[PeriodData, ...]
+    teachers: tuple[TeacherData, ...]
+    rooms: tuple[RoomData, ...]
+    courses: tuple[CourseData, ...]
+    anchors: tuple[AnchorData, ...]
+    mandatory_schedules: tuple[MandatoryScheduleData, ...]
+
+    @cached_property
+    def period_map(self):
+        return {period.pk: period for period in self.periods}
+
+    @cached_property
+    def teacher_map(self):
+        return {teacher.pk: teacher for teacher in self.teachers}
+
+    @cached_property
+    def room_map(self):
+        return {room.pk: room for room in self.rooms}
+
+    @cached_property
+    def course_map(self):
+        return {course.pk: course for course in self.courses}
+
+    @cached_property
+    def avoided_periods(self):
+        return frozenset(period.pk for period in self.periods if period.avoid)
+
+    def restrict(self, course_pks):
+        courses = tuple(course for course in self.courses if course.pk in course_pks)
+        teachers = frozenset().union(*(course.teachers for course in courses))
+        rooms = frozenset().union(*(course.rooms for course in courses))
+        return replace(
+            self,
+            teachers=tuple(t for t in self.teachers if t.pk in teachers),
+            rooms=tuple(r for r in self.rooms if r.pk in rooms),
+            courses=courses,
+            anchors=tuple(a for a in self.anchors if a.course in course_pks),
+            mandatory_schedules=tuple(
+                ms for ms in self.mandatory_schedules if ms.courses & course_pks
+            ),
+        )
+
+
+def group_pairs(pairs):
+    groups = {}
+    for key, value in pairs:
+        groups.setdefault(key, set()).add(value)
+    return groups
+
+
+def load_snapshot(org_pk: int):
+    periods = tuple(
+        PeriodData(*values)
+        for values in models.Period.objects.filter(organization=org_pk)
+        .order_by("pk")
+        .values_list("pk", "number", "start", "end", "avoid")
+    )
+    teachers = tuple(
+        TeacherData(teacher.pk, str(teacher))
+        for teacher in models.Teacher.objects.filter(organization=org_pk).order_by("pk")
+    )
+    rooms = tuple(
+        RoomData(room.pk, str(room))
+        for room in models.Room.objects.filter(organization=org_pk)
+        .select_related("building")
+        .order_by("pk")
+    )
+
+    course_teachers = group_pairs(
+        models.Course.teacher.through.objects.filter(
+            course__organization=org_pk
+        ).values_list("course_id", "teacher_id")
+    )
+    course_rooms = group_pairs(
+        models.Course.room.through.objects.filter(
+            course__organization=org_pk
+        ).values_list("course_id", "room_id")
+    )
+    course_barred_periods = group_pairs(
+        models.Course.barred_period.through.objects.filter(
+            course__organization=org_pk
+        ).values_list("course_id", "period_id")
+    )
+    courses = tuple(
+        CourseData(
+            pk=pk,
+            name=name,
+            number_offered=number_offered,
+            teachers=frozenset(course_teachers.get(pk, ())),
+            rooms=frozenset(course_rooms.get(pk, ())),
+            barred_periods=frozenset(course_barred_periods.get(pk, ())),
+        )
+        for pk, name, number_offered in models.Course.objects.filter(
+            organization=org_pk
+        )
+        .order_by("pk")
+        .values_list("pk", "name", "number_offered")
+    )
+
+    anchors = tuple(
+        AnchorData(*values)
+        for values in models.AnchoredCourse.objects.filter(organization=org_pk)
+        .order_by("pk")
+        .values_list("pk", "period", "teacher", "room", "course")
+    )
+
+    schedule_courses = group_pairs(
+        models.MandatorySchedule.courses.through.objects.filter(
+            mandatoryschedule__organization=org_pk
+        ).values_list("mandatoryschedule_id", "course_id")
+    )
+    mandatory_schedules = tuple(
+        MandatoryScheduleData(pk, name, frozenset(schedule_courses.get(pk, ())))
+        for pk, name in models.MandatorySchedule.objects.filter(organization=org_pk)
+        .order_by("pk")
+        .values_list("pk", "name")
+    )
+
+    return Snapshot(
+        org_pk=org_pk,
+        periods=periods,
+        teachers=teachers,
+        rooms=rooms,
+        courses=courses,
+        anchors=anchors,
+        mandatory_schedules=mandatory_schedules,
+    )
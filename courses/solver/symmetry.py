@@ -0,0 +1,49 @@
+from collections import defaultdict
+
+from courses.solver.snapshot import Snapshot
+
+RESOURCES = (("teacher", "teachers", 1), ("room", "rooms", 2))
+
+
+def get_interchangeable(snapshot: Snapshot, plural):
+    courses = defaultdict(set)
+    for course in snapshot.courses:
+        for x in getattr(course, plural):
+            courses[x].add(course.pk)
+
+    classes = defaultdict(list)
+    for x, course_pks in sorted(courses.items()):
+        classes[frozenset(course_pks)].append(x)
+    return [resources for resources in classes.values() if len(resources) > 1]
+
+
+def get_free_resources(snapshot: Snapshot, resource, plural):
+    anchored = {(a.period, getattr(a, resource)) for a in snapshot.anchors}
+    return {
+        (p.pk, tuple(resources)): [x for x in resources if (p.pk, x) not in anchored]
+        for resources in get_interchangeable(snapshot, plural)
+        for p in snapshot.periods
+    }
+
+
+def get_ordered_pairs(snapshot: Snapshot, resource, plural):
+    return [
+        (p, a, b)
+        for (p, _), free in get_free_resources(snapshot, resource, plural).items()
+        for a, b in zip(free, free[1:])
+    ]
+
+
+def canonicalize(snapshot: Snapshot, assignments):
+    assignments = list(assignments)
+    for resource, plural, index in RESOURCES:
+        relabel = {}
+        for (p, _), free in get_free_resources(snapshot, resource, plural).items():
+            used = sorted({a[index] for a in assignments if a[0] == p} & set(free))
+            relabel.update(((p, x), y) for x, y in zip(used, free))
+
+        assignments = [
+            a[:index] + (relabel.get((a[0], a[index]), a[index]),) + a[index + 1 :]
+            for a in assignments
+        ]
+    return assignments
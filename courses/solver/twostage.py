@@ -0,0 +1,68 @@
+from collections import defaultdict
+
+import numpy as np
+
+from courses.solver.matching import find_matching
+from courses.solver.matrix import MatrixModel
+from courses.solver.snapshot import Snapshot
+
+
+def get_deficient_rooms(adjacency, matching):
+    matched = {r: section for section, r in matching.items()}
+    stack = [section for section in adjacency if section not in matching]
+    visited = set(stack)
+    rooms = set()
+    while stack:
+        for r in adjacency[stack.pop()]:
+            rooms.add(r)
+            if r in matched and matched[r] not in visited:
+                visited.add(matched[r])
+                stack.append(matched[r])
+    return frozenset(rooms)
+
+
+def assign_rooms(snapshot: Snapshot, period_assignments):
+    anchored = {(a.period, a.teacher, a.course): a.room for a in snapshot.anchors}
+    taken = {(a.period, a.room) for a in snapshot.anchors}
+
+    assignments = []
+    sections = defaultdict(dict)
+    for p, t, c in period_assignments:
+        if (p, t, c) in anchored:
+            assignments.append((p, t, anchored[p, t, c], c))
+        else:
+            sections[p][t, c] = [
+                r for r in sorted(snapshot.course_map[c].rooms) if (p, r) not in taken
+            ]
+
+    deficient = []
+    for p, adjacency in sections.items():
+        matching = find_matching(adjacency)
+        if len(matching) < len(adjacency):
+            deficient.append((p, get_deficient_rooms(adjacency, matching)))
+        assignments += [(p, t, r, c) for (t, c), r in matching.items()]
+    return assignments, deficient
+
+
+def add_room_cuts(snapshot: Snapshot, matrix: MatrixModel, deficient):
+    anchored = defaultdict(set)
+    for anchor in snapshot.anchors:
+        anchored[anchor.period].add(anchor.room)
+
+    rows, cols = [], []
+    for i, (p, rooms) in enumerate(deficient):
+        allowed = rooms | anchored[p]
+        for j, (period, t, c) in enumerate(matrix.assignments.tolist()):
+            if period == p and snapshot.course_map[c].rooms <= allowed:
+                rows.append(i)
+                cols.append(j)
+
+    return matrix.with_rows(
+        "room_cuts",
+        np.array(rows, dtype=np.int64),
+        np.array(cols, dtype=np.int64),
+        np.ones(len(cols)),
+        np.full(len(deficient), -np.inf),
+        np.array([len(rooms) for p, rooms in deficient], dtype=float),
+        [(p, tuple(sorted(rooms))) for p, rooms in deficient],
+    )
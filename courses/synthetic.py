@@ -0,0 +1,200 @@
+import datetime
+import random
+
+from django.db import transaction
+
+from courses import models
+
+TIERS = {
+    "small": dict(
+        periods=6,
+        teachers=12,
+        rooms=10,
+        courses=24,
+        anchor_ratio=0.1,
+        mandatory_schedules=4,
+        mandatory_length=4,
+    ),
+    "medium": dict(
+        periods=8,
+        teachers=40,
+        rooms=32,
+        courses=100,
+        anchor_ratio=0.2,
+        mandatory_schedules=20,
+        mandatory_length=6,
+    ),
+    "large": dict(
+        periods=8,
+        teachers=120,
+        rooms=90,
+        courses=320,
+        anchor_ratio=0.3,
+        mandatory_schedules=60,
+        mandatory_length=7,
+    ),
+}
+
+
+def get_reference_schedule(rnd, periods, teachers, rooms, courses):
+    sections = []
+    for p in range(periods):
+        count = min(teachers, rooms) * 4 // 5
+        sections += zip(
+            [p] * count,
+            rnd.sample(range(teachers), count),
+            rnd.sample(range(rooms), count),
+        )
+    rnd.shuffle(sections)
+
+    schedule = [[] for _ in range(courses)]
+    for c in range(courses):
+        for _ in range(rnd.randint(1, 3)):
+            if sections:
+                schedule[c].append(sections.pop())
+    return schedule
+
+
+def get_mandatory_courses(rnd, schedule, length):
+    by_period = {}
+    for c, sections in enumerate(schedule):
+        if len(sections) == 1:
+            by_period.setdefault(sections[0][0], []).append(c)
+
+    periods = rnd.sample(sorted(by_period), min(length, len(by_period)))
+    return [rnd.choice(by_period[p]) for p in periods]
+
+
+def create_all(model, organization, objects):
+    model.objects.bulk_create(objects)
+    return list(model.objects.filter(organization=organization).order_by("pk"))
+
+
+@transaction.atomic
+def generate_organization(
+    seed,
+    periods,
+    teachers,
+    rooms,
+    courses,
+    anchor_ratio,
+    mandatory_schedules,
+    mandatory_length,
+    name=None,
+):
+    rnd = random.Random(seed)
+    schedule = get_reference_schedule(rnd, periods, teachers, rooms, courses)
+
+    organization = models.Organization.objects.create(
+        name=name or f"Synthetic {seed}", city="", state="", zipcode=""
+    )
+    period_objects = create_all(
+        models.Period,
+        organization,
+        [
+            models.Period(
+                organization=organization,
+                number=i + 1,
+                start=datetime.time(7 + i),
+                end=datetime.time(7 + i, 50),
+                avoid=i == periods - 1,
+            )
+            for i in range(periods)
+        ],
+    )
+    teacher_objects = create_all(
+        models.Teacher,
+        organization,
+        [
+            models.Teacher(
+                organization=organization, last_name=f"Teacher {i}", first_name=""
+            )
+            for i in range(teachers)
+        ],
+    )
+    building = models.Building.objects.create(organization=organization, name="Main")
+    room_objects = create_all(
+        models.Room,
+        organization,
+        [
+            models.Room(organization=organization, number=i + 1, building=building)
+            for i in range(rooms)
+        ],
+    )
+    course_objects = create_all(
+        models.Course,
+        organization,
+        [
+            models.Course(
+                organization=organization,
+                name=f"Course {c}",
+                number_offered=len(schedule[c]),
+            )
+            for c in range(courses)
+        ],
+    )
+
+    course_teachers, course_rooms, course_barred_periods = [], [], []
+    for c, sections in enumerate(schedule):
+        used_teachers = {t for p, t, r in sections} | {rnd.randrange(teachers)}
+        used_rooms = {r for p, t, r in sections} | set(rnd.sample(range(rooms), 2))
+        used_periods = {p for p, t, r in sections}
+        course_teachers += [(c, t) for t in used_teachers]
+        course_rooms += [(c, r) for r in used_rooms]
+        if rnd.random() < 0.3 and len(used_periods) < periods:
+            barred = rnd.choice([p for p in range(periods) if p not in used_periods])
+            course_barred_periods.append((c, barred))
+
+    models.Course.teacher.through.objects.bulk_create(
+        models.Course.teacher.through(
+            course_id=course_objects[c].pk, teacher_id=teacher_objects[t].pk
+        )
+        for c, t in course_teachers
+    )
+    models.Course.room.through.objects.bulk_create(
+        models.Course.room.through(
+            course_id=course_objects[c].pk, room_id=room_objects[r].pk
+        )
+        for c, r in course_rooms
+    )
+    models.Course.barred_period.through.objects.bulk_create(
+        models.Course.barred_period.through(
+            course_id=course_objects[c].pk, period_id=period_objects[p].pk
+        )
+        for c, p in course_barred_periods
+    )
+
+    sections = [
+        (c, section) for c, sections in enumerate(schedule) for section in sections
+    ]
+    models.AnchoredCourse.objects.bulk_create(
+        models.AnchoredCourse(
+            organization=organization,
+            course=course_objects[c],
+            period=period_objects[p],
+            teacher=teacher_objects[t],
+            room=room_objects[r],
+        )
+        for c, (p, t, r) in rnd.sample(sections, int(len(sections) * anchor_ratio))
+    )
+
+    schedule_objects = create_all(
+        models.MandatorySchedule,
+        organization,
+        [
+            models.MandatorySchedule(organization=organization, name=f"Schedule {i}")
+            for i in range(mandatory_schedules)
+        ],
+    )
+    models.MandatorySchedule.courses.through.objects.bulk_create(
+        models.MandatorySchedule.courses.through(
+            mandatoryschedule_id=schedule_object.pk, course_id=course_objects[c].pk
+        )
+        for schedule_object in schedule_objects
+        for c in get_mandatory_courses(rnd, schedule, mandatory_length)
+    )
+    return organization
+
+
+def generate_tier(tier, seed, name=None):
+    return generate_organization(seed, name=name, **TIERS[tier])
@@ -1,3 +1,898 @@
-from django.test import TestCase
+import datetime
+import importlib.util
+import os
+import tempfile
+from dataclasses import replace
+from unittest import skipUnless
 
-# Create your tests here.
+import numpy as np
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.test import TestCase, override_settings
+
+from courses import models
+from courses.solver import backends, cache, mps
+from courses.solver.benchmark import PHASES, run_benchmark
+from courses.solver.conflict import explain_infeasibility
+from courses.solver.decompose import get_components, merge_results
+from courses.solver.instance import read_instance, write_instance
+from courses.solver.matrix import MatrixModel, build_matrix
+from courses.solver.metrics import SolveMetrics, exclusive_peak_rss, read_rss
+from courses.solver.pipeline import (
+    solve,
+    solve_component_alternatives,
+    solve_components,
+)
+from courses.solver.precheck import check_snapshot
+from courses.solver.presolve import (
+    collapse_mandatory_schedules,
+    presolve,
+    reduce_domains,
+)
+from courses.solver.progress import Progress
+from courses.solver.snapshot import (
+    AnchorData,
+    CourseData,
+    MandatoryScheduleData,
+    PeriodData,
+    RoomData,
+    Snapshot,
+    TeacherData,
+    load_snapshot,
+)
+from courses.solver.symmetry import get_ordered_pairs
+from courses.synthetic import generate_tier
+
+HAS_HIGHSPY = importlib.util.find_spec("highspy") is not None
+
+
+def get_small_snapshot():
+    start, end = datetime.time(8), datetime.time(9)
+    return Snapshot(
+        org_pk=1,
+        periods=tuple(PeriodData(pk, pk, start, end, pk == 3) for pk in (1, 2, 3)),
+        teachers=(TeacherData(1, "Teacher 1"), TeacherData(2, "Teacher 2")),
+        rooms=(RoomData(1, "Room 1"), RoomData(2, "Room 2")),
+        courses=(
+            CourseData(1, "A", 2, frozenset({1}), frozenset({1}), frozenset()),
+            CourseData(2, "B", 1, frozenset({1}), frozenset({1}), frozenset()),
+            CourseData(3, "C", 1, frozenset({2}), frozenset({2}), frozenset({1})),
+            CourseData(4, "D", 2, frozenset({2}), frozenset({1, 2}), frozenset()),
+        ),
+        anchors=(AnchorData(1, 1, 1, 1, 1),),
+        mandatory_schedules=(
+            MandatoryScheduleData(1, "B and C", frozenset({2, 3})),
+            MandatoryScheduleData(2, "B", frozenset({2})),
+        ),
+    )
+
+
+def get_backend(name, **options):
+    backend = backends.get_backend(name)
+    backend.tee = False
+    for option, value in options.items():
+        setattr(backend, option, value)
+    return backend
+
+
+class SyntheticOrganizationTests(TestCase):
+    def test_generated_organization_is_deterministic(self):
+        first = load_snapshot(generate_tier("small", 0).pk)
+        second = load_snapshot(generate_tier("small", 0).pk)
+        self.assertEqual(
+            [c.number_offered for c in first.courses],
+            [c.number_offered for c in second.courses],
+        )
+        self.assertEqual(len(first.anchors), len(second.anchors))
+
+    def test_generated_organization_passes_precheck(self):
+        snapshot = load_snapshot(generate_tier("small", 1).pk)
+        self.assertEqual(check_snapshot(snapshot), [])
+
+
+class SnapshotTests(TestCase):
+    def test_load_snapshot_is_deterministic(self):
+        organization = generate_tier("small", 3)
+        first = load_snapshot(organization.pk)
+        second = load_snapshot(organization.pk)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.get_cache_key(first), cache.get_cache_key(second))
+
+    def test_cache_key(self):
+        snapshot = get_small_snapshot()
+        reordered = replace(
+            snapshot,
+            courses=snapshot.courses[::-1],
+            mandatory_schedules=snapshot.mandatory_schedules[::-1],
+        )
+        changed = replace(
+            snapshot,
+            courses=(replace(snapshot.courses[0], number_offered=3),)
+            + snapshot.courses[1:],
+        )
+        key = cache.get_cache_key(snapshot)
+        self.assertEqual(cache.get_cache_key(reordered), key)
+        self.assertNotEqual(cache.get_cache_key(changed), key)
+
+
+@override_settings(SOLUTION_CACHE_SIZE=2)
+class CacheTests(TestCase):
+    def test_hit(self):
+        organization = generate_tier("small", 0)
+        cache.store_assignments(organization.pk, "a", [(1, 2, 3, 4)])
+        self.assertEqual(
+            cache.get_cached_assignments(organization.pk, "a"), [(1, 2, 3, 4)]
+        )
+        self.assertIsNone(cache.get_cached_assignments(organization.pk, "b"))
+
+    def test_least_recently_used_is_evicted(self):
+        organization = generate_tier("small", 0)
+        cache.store_assignments(organization.pk, "a", [(1, 2, 3, 4)])
+        cache.store_assignments(organization.pk, "b", [(5, 6, 7, 8)])
+        cache.get_cached_assignments(organization.pk, "a")
+        cache.store_assignments(organization.pk, "c", [(9, 10, 11, 12)])
+        self.assertEqual(
+            set(
+                models.CachedSolution.objects.filter(
+                    organization=organization
+                ).values_list("key", flat=True)
+            ),
+            {"a", "c"},
+        )
+
+
+class InstanceTests(TestCase):
+    def test_round_trip(self):
+        snapshot = load_snapshot(generate_tier("small", 2).pk)
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("instance.json", "instance.json.gz"):
+                path = os.path.join(directory, name)
+                write_instance(snapshot, path)
+                self.assertEqual(read_instance(path), snapshot)
+
+
+class BackendTests(TestCase):
+    def test_glpk_time_limit_is_an_integer(self):
+        backend = get_backend("glpk", time_limit=12.5)
+        self.assertEqual(backend.get_solver_options()["tmlim"], 13)
+        self.assertIsInstance(backend.get_solver_options()["tmlim"], int)
+
+    def test_unknown_appsi_solver(self):
+        backend = get_backend("highs", solver="missing")
+        with self.assertRaises(ImproperlyConfigured):
+            backend.get_solver()
+
+
+class SolveTests(TestCase):
+    def test_unknown_backend(self):
+        organization = generate_tier("small", 0)
+        organization.solver_backend = "missing"
+        with self.assertRaises(ValidationError):
+            organization.full_clean()
+
+        organization.save()
+        solved_schedule = models.SolvedSchedule.objects.create(
+            organization=organization, name="Unknown"
+        )
+        solve(organization.pk, solved_schedule.pk)
+        solved_schedule.refresh_from_db()
+        self.assertTrue(solved_schedule.finished)
+        self.assertFalse(solved_schedule.solved)
+        self.assertEqual(solved_schedule.problems, ["Unknown solver backend 'missing'"])
+
+    @skipUnless(HAS_HIGHSPY, "highspy is not installed")
+    def test_cache_hit_keeps_objective(self):
+        organization = generate_tier("small", 1)
+        organization.solver_backend = "highs-matrix"
+        organization.save()
+        solved, cached = [
+            models.SolvedSchedule.objects.create(organization=organization, name=name)
+            for name in ("Solved", "Cached")
+        ]
+        solve(organization.pk, solved.pk)
+        solve(organization.pk, cached.pk)
+        solved.refresh_from_db()
+        cached.refresh_from_db()
+        self.assertEqual(cached.metrics["status"], "cached")
+        self.assertTrue(cached.optimal)
+        self.assertEqual(cached.objective, solved.objective)
+        self.assertEqual(cached.bound, cached.objective)
+        self.assertEqual(cached.gap, 0)
+
+    @skipUnless(HAS_HIGHSPY, "highspy is not installed")
+    def test_warm_start_status(self):
+        organization = generate_tier("small", 2)
+        organization.solver_backend = "highs-matrix"
+        organization.save()
+
+        def solve_schedule(name):
+            solved_schedule = models.SolvedSchedule.objects.create(
+                organization=organization, name=name, warm_start=True
+            )
+            solve(organization.pk, solved_schedule.pk)
+            solved_schedule.refresh_from_db()
+            return solved_schedule
+
+        first = solve_schedule("First")
+        self.assertEqual(
+            first.warm_start_status, models.SolvedSchedule.WARM_START_UNAVAILABLE
+        )
+
+        last_period = models.Period.objects.filter(organization=organization).last()
+        models.Period.objects.create(
+            organization=organization,
+            number=last_period.number + 1,
+            start=last_period.start,
+            end=last_period.end,
+        )
+        second = solve_schedule("Second")
+        self.assertEqual(
+            second.warm_start_status, models.SolvedSchedule.WARM_START_ACCEPTED
+        )
+        self.assertEqual(second.objective, first.objective)
+
+        anchored = models.AnchoredCourse.objects.values("course")
+        item = second.scheduleitem_set.exclude(course_pk__in=anchored).first()
+        models.Course.objects.get(pk=item.course_pk).barred_period.add(item.period_pk)
+        third = solve_schedule("Third")
+        self.assertEqual(
+            third.warm_start_status, models.SolvedSchedule.WARM_START_INFEASIBLE
+        )
+
+    @skipUnless(HAS_HIGHSPY, "highspy is not installed")
+    def test_repair(self):
+        organization = generate_tier("small", 0)
+        organization.solver_backend = "highs-matrix"
+        organization.save()
+
+        def solve_schedule(name, **kwargs):
+            solved_schedule = models.SolvedSchedule.objects.create(
+                organization=organization, name=name, **kwargs
+            )
+            solve(organization.pk, solved_schedule.pk)
+            solved_schedule.refresh_from_db()
+            return solved_schedule
+
+        base = solve_schedule("Base")
+        self.assertTrue(base.optimal)
+
+        anchored = models.AnchoredCourse.objects.values("course")
+        item = base.scheduleitem_set.exclude(course_pk__in=anchored).first()
+        course = models.Course.objects.get(pk=item.course_pk)
+        course.room.set(
+            models.Room.objects.filter(organization=organization).exclude(
+                pk=item.room_pk
+            )
+        )
+
+        repair = solve_schedule("Repair", repair=True)
+        self.assertTrue(repair.solved)
+        self.assertFalse(repair.optimal)
+        self.assertEqual(repair.repair_of, base)
+        self.assertGreaterEqual(repair.repaired_courses, 1)
+        self.assertEqual(repair.warm_start_status, "")
+
+        full = solve_schedule("Full")
+        self.assertTrue(full.optimal)
+        self.assertNotEqual(full.metrics["status"], "cached")
+
+    @skipUnless(HAS_HIGHSPY, "highspy is not installed")
+    @override_settings(SOLVER_CONFLICT_BACKEND="missing")
+    def test_conflict_backend_unavailable(self):
+        organization = models.Organization.objects.create(
+            name="Infeasible", city="City", state="State", zipcode="00000"
+        )
+        periods = [
+            models.Period.objects.create(
+                organization=organization,
+                number=number,
+                start=datetime.time(8),
+                end=datetime.time(9),
+            )
+            for number in (1, 2)
+        ]
+        teachers = [
+            models.Teacher.objects.create(
+                organization=organization, last_name=name, first_name=name
+            )
+            for name in ("Teacher", "Other")
+        ]
+        building = models.Building.objects.create(
+            organization=organization, name="Main"
+        )
+        rooms = [
+            models.Room.objects.create(
+                organization=organization, number=number, building=building
+            )
+            for number in (1, 2, 3)
+        ]
+        courses = []
+        for name, teacher, room in zip("ABC", [0, 0, 1], rooms):
+            course = models.Course.objects.create(organization=organization, name=name)
+            course.teacher.set([teachers[teacher]])
+            course.room.set([room])
+            courses.append(course)
+        courses[2].barred_period.set([periods[1]])
+        for name, course in (("A and C", courses[0]), ("B and C", courses[1])):
+            mandatory_schedule = models.MandatorySchedule.objects.create(
+                organization=organization, name=name
+            )
+            mandatory_schedule.courses.set([course, courses[2]])
+        organization.solver_backend = "highs-matrix"
+        organization.save()
+
+        solved_schedule = models.SolvedSchedule.objects.create(
+            organization=organization, name="Infeasible"
+        )
+        solve(organization.pk, solved_schedule.pk)
+        solved_schedule.refresh_from_db()
+        self.assertTrue(solved_schedule.finished)
+        self.assertFalse(solved_schedule.solved)
+        self.assertEqual(solved_schedule.problems, [])
+        self.assertEqual(solved_schedule.conflicts, [])
+        self.assertEqual(solved_schedule.metrics["status"], backends.INFEASIBLE)
+
+
+@skipUnless(HAS_HIGHSPY, "highspy is not installed")
+class SolverBenchmarkTests(TestCase):
+    def test_small_tier(self):
+        organization = generate_tier("small", 0)
+        for name in ("highs", "highs-matrix", "highs-two-stage"):
+            with self.subTest(backend=name):
+                backend = backends.get_backend(name)
+                backend.tee = False
+                run = run_benchmark(backend, organization.pk)
+                self.assertEqual(run["status"], backends.OPTIMAL)
+                self.assertEqual(tuple(run["phases"]), PHASES)
+                self.assertNotIn("peak_memory", run["phases"]["solve"])
+                self.assertFalse(organization.solvedschedule_set.exists())
+
+    def test_trace_memory(self):
+        organization = generate_tier("small", 0)
+        backend = backends.get_backend("highs-matrix")
+        backend.tee = False
+        run = run_benchmark(backend, organization.pk, trace_memory=True)
+        self.assertEqual(run["status"], backends.OPTIMAL)
+        self.assertGreater(run["stats"]["variables"], 0)
+        for name in PHASES:
+            self.assertIn("seconds", run["phases"][name])
+        for name in ("load", "presolve", "solve"):
+            self.assertGreater(run["phases"][name]["peak_memory"], 0)
+
+
+@skipUnless(os.path.exists("/proc/self/clear_refs"), "peak RSS cannot be reset")
+class MetricsTests(TestCase):
+    def test_peak_rss_per_phase(self):
+        metrics = SolveMetrics()
+        with exclusive_peak_rss():
+            with metrics.phase("solve"):
+                with metrics.phase("build"):
+                    data = b"x" * 200 * 2**20
+                    del data
+                with metrics.phase("write"):
+                    pass
+        phases = metrics.phases
+        self.assertGreater(phases["build"]["peak_rss"], 200 * 2**20)
+        self.assertLess(phases["write"]["peak_rss"], phases["build"]["peak_rss"])
+        self.assertEqual(phases["solve"]["peak_rss"], phases["build"]["peak_rss"])
+        self.assertEqual(
+            {phase["peak_rss_scope"] for phase in phases.values()}, {"phase"}
+        )
+
+    def test_shared_process_keeps_peak_rss(self):
+        with exclusive_peak_rss():
+            with SolveMetrics().phase("build"):
+                data = b"x" * 200 * 2**20
+                del data
+        metrics = SolveMetrics()
+        with metrics.phase("write"):
+            pass
+        self.assertEqual(metrics.phases["write"]["peak_rss_scope"], "process")
+        self.assertLess(metrics.phases["write"]["peak_rss"], 200 * 2**20)
+        self.assertGreater(read_rss("VmHWM"), 200 * 2**20)
+
+
+@skipUnless(HAS_HIGHSPY, "highspy is not installed")
+class FormulationTests(TestCase):
+    def test_formulations_agree(self):
+        snapshot = get_small_snapshot()
+        for name in ("highs", "highs-matrix", "heuristic"):
+            for reduce in (False, True):
+                with self.subTest(backend=name, presolve=reduce):
+                    reduced = snapshot
+                    if reduce:
+                        reduced = presolve(snapshot, SolveMetrics())
+                    backend = get_backend(name)
+                    solver_result, assignments, _ = solve_components(
+                        get_components(reduced),
+                        backend,
+                        Progress(None, backend.time_limit),
+                    )
+                    self.assertTrue(solver_result.has_solution)
+                    self.assertEqual(solver_result.objective, 2)
+                    self.assertEqual(
+                        sorted(c for p, t, r, c in assignments), [1, 1, 2, 3, 4, 4]
+                    )
+
+    def test_symmetry_breaking_keeps_optimum(self):
+        snapshot = get_small_snapshot()
+        snapshot = replace(
+            snapshot,
+            courses=tuple(
+                replace(c, teachers=frozenset({1, 2}), rooms=frozenset({1, 2}))
+                for c in snapshot.courses
+            ),
+        )
+        teacher_pairs = get_ordered_pairs(snapshot, "teacher", "teachers")
+        room_pairs = get_ordered_pairs(snapshot, "room", "rooms")
+        self.assertEqual(teacher_pairs, [(2, 1, 2), (3, 1, 2)])
+        self.assertEqual(room_pairs, [(2, 1, 2), (3, 1, 2)])
+
+        for name in ("highs", "highs-matrix"):
+            for symmetry_breaking in (False, True):
+                with self.subTest(backend=name, symmetry_breaking=symmetry_breaking):
+                    backend = get_backend(name, symmetry_breaking=symmetry_breaking)
+                    solver_result, assignments, _ = solve_components(
+                        get_components(snapshot),
+                        backend,
+                        Progress(None, backend.time_limit),
+                    )
+                    self.assertEqual(solver_result.status, backends.OPTIMAL)
+                    self.assertEqual(solver_result.objective, 2)
+                    if symmetry_breaking:
+                        teachers = {(p, t) for p, t, r, c in assignments}
+                        rooms = {(p, r) for p, t, r, c in assignments}
+                        for p, a, b in teacher_pairs:
+                            self.assertLessEqual((p, b) in teachers, (p, a) in teachers)
+                        for p, a, b in room_pairs:
+                            self.assertLessEqual((p, b) in rooms, (p, a) in rooms)
+
+
+class HeuristicTests(TestCase):
+    def assertValidSchedule(self, snapshot, assignments):
+        matrix = build_matrix(snapshot)
+        self.assertTrue(matrix.is_feasible(matrix.get_start(assignments)))
+
+    def test_valid_schedule(self):
+        for snapshot in (
+            get_small_snapshot(),
+            load_snapshot(generate_tier("small", 0).pk),
+        ):
+            for two_stage in (False, True):
+                with self.subTest(org=snapshot.org_pk, two_stage=two_stage):
+                    backend = get_backend("heuristic", two_stage=two_stage)
+                    solver_result, assignments, _ = solve_components(
+                        get_components(snapshot),
+                        backend,
+                        Progress(None, backend.time_limit),
+                    )
+                    self.assertTrue(solver_result.has_solution)
+                    self.assertValidSchedule(snapshot, assignments)
+
+    @skipUnless(HAS_HIGHSPY, "highspy is not installed")
+    def test_heuristic_start(self):
+        snapshot = get_small_snapshot()
+        for name in ("highs", "highs-matrix", "highs-two-stage"):
+            with self.subTest(backend=name):
+                backend = get_backend(name, heuristic_start=True)
+                solver_result, assignments, warm_start_status = solve_components(
+                    get_components(snapshot),
+                    backend,
+                    Progress(None, backend.time_limit),
+                )
+                self.assertEqual(solver_result.status, backends.OPTIMAL)
+                self.assertEqual(solver_result.objective, 2)
+                self.assertEqual(warm_start_status, "")
+                self.assertIn("heuristic", solver_result.metrics.phases)
+                self.assertValidSchedule(snapshot, assignments)
+
+
+def get_small_matrix():
+    return MatrixModel(
+        assignments=np.zeros((3, 4), dtype=np.int64),
+        anchored=np.zeros((0, 4), dtype=np.int64),
+        mandatory_slots=np.zeros((0, 3), dtype=np.int64),
+        objective=np.array([1.0, 0.0, 2.0]),
+        objective_offset=2.0,
+        col_lower=np.zeros(3),
+        col_upper=np.array([1.0, 0.0, 1.0]),
+        rows=np.array([0, 0, 1, 2, 3]),
+        cols=np.array([0, 1, 1, 0, 2]),
+        values=np.array([1.0, 1.0, 2.0, 1.0, 1.0]),
+        row_lower=np.array([1.0, -np.inf, 0.5, 0.0]),
+        row_upper=np.array([1.0, 3.0, 2.0, np.inf]),
+        row_blocks=[],
+    )
+
+
+class MpsTests(TestCase):
+    def read_solution(self, reader, text):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "solution.txt")
+            with open(path, "w") as f:
+                f.write(text)
+            solver_result, x = reader(path, 3)
+        return solver_result.status, solver_result.objective, x.tolist()
+
+    def test_write_mps(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "model.mps")
+            mps.write_mps(get_small_matrix(), path)
+            with open(path) as f:
+                text = f.read()
+            if HAS_HIGHSPY:
+                import highspy
+
+                solver = highspy.Highs()
+                solver.setOptionValue("output_flag", False)
+                solver.readModel(path)
+                solver.run()
+                self.assertEqual(solver.getInfo().objective_function_value, 3)
+        self.assertEqual(
+            text.splitlines(),
+            [
+                "NAME SCHEDULE",
+                "ROWS",
+                " N OBJ",
+                " E r0",
+                " L r1",
+                " L r2",
+                " G r3",
+                "COLUMNS",
+                " MARKER 'MARKER' 'INTORG'",
+                " x0 OBJ 1",
+                " x0 r0 1",
+                " x0 r2 1",
+                " x1 OBJ 0",
+                " x1 r0 1",
+                " x1 r1 2",
+                " x2 OBJ 2",
+                " x2 r3 1",
+                " MARKER 'MARKER' 'INTEND'",
+                "RHS",
+                " RHS OBJ -2",
+                " RHS r0 1",
+                " RHS r1 3",
+                " RHS r2 2",
+                "RANGES",
+                " RNG r2 1.5",
+                "BOUNDS",
+                " BV BND x0",
+                " FX BND x1 0",
+                " BV BND x2",
+                "ENDATA",
+            ],
+        )
+
+    def test_read_cbc_solution(self):
+        self.assertEqual(
+            self.read_solution(
+                mps.read_cbc_solution,
+                "Optimal - objective value 3.00000000\n"
+                "      0 x0                     1                       1\n"
+                "      2 x2                     0                       2\n",
+            ),
+            (backends.OPTIMAL, 3, [1, 0, 0]),
+        )
+        self.assertEqual(
+            self.read_solution(
+                mps.read_cbc_solution,
+                "Stopped on time - objective value 4.00000000\n"
+                "      2 x2                     1                       2\n",
+            ),
+            (backends.FEASIBLE, 4, [0, 0, 1]),
+        )
+        self.assertEqual(
+            self.read_solution(
+                mps.read_cbc_solution,
+                "Infeasible - objective value 0.00000000\n"
+                "**    0 x0                     1                       1\n",
+            )[:2],
+            (backends.INFEASIBLE, 0),
+        )
+
+    def test_read_glpk_solution(self):
+        self.assertEqual(
+            self.read_solution(
+                mps.read_glpk_solution,
+                "c Problem:\n"
+                "s mip 4 3 o 3\n"
+                "i 1 1\n"
+                "j 1 1\n"
+                "j 2 0\n"
+                "j 3 0\n"
+                "e o f\n",
+            ),
+            (backends.OPTIMAL, 3, [1, 0, 0]),
+        )
+        self.assertEqual(
+            self.read_solution(mps.read_glpk_solution, "s mip 4 3 n 0\ne o f\n"),
+            (backends.INFEASIBLE, None, [0, 0, 0]),
+        )
+        self.assertEqual(
+            self.read_solution(mps.read_glpk_solution, "s mip 4 3 u 0\ne o f\n"),
+            (backends.NO_SOLUTION, None, [0, 0, 0]),
+        )
+
+    def test_read_highs_solution(self):
+        self.assertEqual(
+            self.read_solution(
+                mps.read_highs_solution,
+                "Model status\n"
+                "Optimal\n"
+                "\n"
+                "# Primal solution values\n"
+                "Feasible\n"
+                "Objective 3\n"
+                "# Columns 3\n"
+                "x0 1\n"
+                "x1 0\n"
+                "x2 0\n"
+                "# Rows 4\n"
+                "r0 1\n",
+            ),
+            (backends.OPTIMAL, 3, [1, 0, 0]),
+        )
+        self.assertEqual(
+            self.read_solution(
+                mps.read_highs_solution,
+                "Model status\n"
+                "Time limit reached\n"
+                "\n"
+                "# Primal solution values\n"
+                "None\n",
+            ),
+            (backends.NO_SOLUTION, None, [0, 0, 0]),
+        )
+
+    def test_glpk_time_limit_is_an_integer(self):
+        backend = get_backend("glpk-mps", time_limit=12.5)
+        self.assertEqual(backend.get_solver_options()["tmlim"], 13)
+
+
+class PrecheckTests(TestCase):
+    def test_course_anchor_and_mandatory_schedule_problems(self):
+        snapshot = replace(
+            get_small_snapshot(),
+            courses=(
+                CourseData(1, "A", 4, frozenset({1}), frozenset({1}), frozenset()),
+                CourseData(2, "B", 1, frozenset({1}), frozenset(), frozenset()),
+                CourseData(3, "C", 1, frozenset({2}), frozenset({2}), frozenset({1})),
+                CourseData(4, "D", 0, frozenset({2}), frozenset({2}), frozenset()),
+            ),
+            anchors=(AnchorData(1, 1, 2, 2, 3),),
+            mandatory_schedules=(
+                MandatoryScheduleData(1, "C and D", frozenset({3, 4})),
+            ),
+        )
+        self.assertEqual(
+            check_snapshot(snapshot),
+            [
+                "A is offered 4 times but its periods, teachers and rooms allow at "
+                "most 3 sections",
+                "B has no rooms",
+                "C is anchored in its barred Period 1",
+                "Mandatory schedule C and D contains D which is not offered",
+                "The courses of mandatory schedule C and D cannot all be placed in "
+                "different periods",
+            ],
+        )
+
+    def test_resource_capacity(self):
+        snapshot = replace(
+            get_small_snapshot(),
+            courses=(
+                CourseData(1, "A", 2, frozenset({1}), frozenset({1, 2}), frozenset()),
+                CourseData(2, "B", 2, frozenset({1}), frozenset({1, 2}), frozenset()),
+            ),
+            anchors=(),
+            mandatory_schedules=(),
+        )
+        self.assertEqual(
+            check_snapshot(snapshot),
+            [
+                "Teacher 1 is the only option for 4 unanchored sections but has "
+                "only 3 free periods"
+            ],
+        )
+
+
+class DecomposeTests(TestCase):
+    def test_components(self):
+        components = get_components(get_small_snapshot())
+        self.assertEqual(
+            sorted(sorted(component.course_map) for component in components),
+            [[1, 2, 3, 4]],
+        )
+        snapshot = replace(
+            get_small_snapshot(),
+            courses=(
+                CourseData(1, "A", 1, frozenset({1}), frozenset({1}), frozenset()),
+                CourseData(2, "B", 1, frozenset({2}), frozenset({2}), frozenset()),
+                CourseData(3, "C", 1, frozenset({2}), frozenset({1}), frozenset()),
+                CourseData(4, "D", 1, frozenset({3}), frozenset({3}), frozenset()),
+            ),
+            anchors=(),
+            mandatory_schedules=(MandatoryScheduleData(1, "D", frozenset({4})),),
+        )
+        components = get_components(snapshot)
+        self.assertEqual(
+            sorted(sorted(component.course_map) for component in components),
+            [[1, 2, 3], [4]],
+        )
+        self.assertEqual(
+            [len(component.mandatory_schedules) for component in components],
+            [0, 1],
+        )
+
+    def test_merge_results(self):
+        merged = merge_results(
+            [
+                backends.SolverResult(backends.OPTIMAL, "optimal", 1, 1),
+                backends.SolverResult(backends.FEASIBLE, "time limit", 2, 1.5),
+            ]
+        )
+        self.assertEqual(merged.status, backends.FEASIBLE)
+        self.assertEqual((merged.objective, merged.bound), (3, 2.5))
+
+        merged = merge_results(
+            [
+                backends.SolverResult(backends.OPTIMAL, "optimal", 1, 1),
+                backends.SolverResult(backends.INFEASIBLE, "infeasible"),
+            ]
+        )
+        self.assertEqual(merged.status, backends.INFEASIBLE)
+        self.assertIsNone(merged.objective)
+
+    def test_no_components(self):
+        backend = get_backend("heuristic")
+        solver_result, assignments, warm_start_status = solve_components(
+            [], backend, Progress(None, backend.time_limit)
+        )
+        self.assertEqual(solver_result.status, backends.OPTIMAL)
+        self.assertEqual(solver_result.objective, 0)
+        self.assertEqual((assignments, warm_start_status), ([], ""))
+
+    def test_solve_organization_without_courses(self):
+        organization = models.Organization.objects.create(
+            name="Empty", city="City", state="State", zipcode="00000"
+        )
+        solved_schedule = models.SolvedSchedule.objects.create(
+            organization=organization, name="Empty"
+        )
+        solve(organization.pk, solved_schedule.pk)
+        solved_schedule.refresh_from_db()
+        self.assertEqual(solved_schedule.problems, [])
+        self.assertTrue(solved_schedule.solved)
+        self.assertTrue(solved_schedule.optimal)
+        self.assertEqual(solved_schedule.objective, 0)
+
+    def test_solve_organization_without_courses_with_alternatives(self):
+        organization = models.Organization.objects.create(
+            name="Empty", city="City", state="State", zipcode="00000"
+        )
+        solved_schedule = models.SolvedSchedule.objects.create(
+            organization=organization, name="Empty", alternatives=2
+        )
+        solve(organization.pk, solved_schedule.pk)
+        solved_schedule.refresh_from_db()
+        self.assertEqual(solved_schedule.problems, [])
+        self.assertTrue(solved_schedule.solved)
+        self.assertEqual(solved_schedule.objective, 0)
+        self.assertEqual(organization.solvedschedule_set.count(), 1)
+
+
+@skipUnless(HAS_HIGHSPY, "highspy is not installed")
+class AlternativesTests(TestCase):
+    def test_alternatives_are_distinct(self):
+        components = get_components(get_small_snapshot())
+        for name in ("highs", "highs-matrix"):
+            with self.subTest(backend=name):
+                backend = get_backend(name)
+                alternatives = solve_component_alternatives(
+                    components, backend, Progress(None, backend.time_limit), 3
+                )
+                self.assertEqual(len(alternatives), 2)
+                placements = [
+                    frozenset((p, c) for p, t, r, c in assignments)
+                    for _, assignments in alternatives
+                ]
+                self.assertEqual(len(set(placements)), 2)
+                self.assertEqual(alternatives[0][0].objective, 2)
+                for solver_result, assignments in alternatives:
+                    self.assertTrue(solver_result.has_solution)
+                    self.assertEqual(
+                        sorted(c for p, t, r, c in assignments), [1, 1, 2, 3, 4, 4]
+                    )
+
+    def test_heuristic_has_one_alternative(self):
+        backend = get_backend("heuristic")
+        alternatives = solve_component_alternatives(
+            get_components(get_small_snapshot()),
+            backend,
+            Progress(None, backend.time_limit),
+            3,
+        )
+        self.assertEqual(len(alternatives), 1)
+        self.assertTrue(alternatives[0][0].has_solution)
+
+    def test_no_components(self):
+        backend = get_backend("highs-matrix")
+        alternatives = solve_component_alternatives(
+            [], backend, Progress(None, backend.time_limit), 2
+        )
+        self.assertEqual(len(alternatives), 1)
+        self.assertEqual(alternatives[0][0].status, backends.OPTIMAL)
+        self.assertEqual(alternatives[0][1], [])
+
+
+class PresolveTests(TestCase):
+    def test_collapse_mandatory_schedules(self):
+        schedules = [
+            MandatoryScheduleData(pk, f"Cohort {pk}", frozenset(courses))
+            for pk, courses in enumerate(
+                [{1, 2}, {1, 2, 3}, {3, 2, 1}, {3, 4}, {4}, {2, 4}, ()]
+            )
+        ]
+        snapshot = Snapshot(1, (), (), (), (), (), tuple(schedules))
+        reduced = collapse_mandatory_schedules(snapshot)
+        self.assertEqual(
+            reduced.mandatory_schedules, (schedules[1], schedules[3], schedules[5])
+        )
+
+    def test_reduce_domains(self):
+        start, end = datetime.time(8), datetime.time(9)
+        snapshot = Snapshot(
+            org_pk=1,
+            periods=tuple(PeriodData(pk, pk, start, end, False) for pk in (1, 2, 3)),
+            teachers=(TeacherData(1, "Teacher 1"), TeacherData(2, "Teacher 2")),
+            rooms=(RoomData(1, "Room 1"), RoomData(2, "Room 2")),
+            courses=(
+                CourseData(
+                    1, "A", 1, frozenset({1, 2}), frozenset({1, 2}), frozenset()
+                ),
+                CourseData(2, "B", 1, frozenset({1}), frozenset({2}), frozenset({3})),
+                CourseData(3, "C", 1, frozenset({2}), frozenset({2}), frozenset()),
+            ),
+            anchors=(AnchorData(1, 1, 1, 1, 1),),
+            mandatory_schedules=(),
+        )
+        reduced = reduce_domains(snapshot)
+        self.assertEqual(
+            reduced.anchors, snapshot.anchors + (AnchorData(None, 2, 1, 2, 2),)
+        )
+        self.assertEqual(
+            [(c.teachers, c.rooms, c.barred_periods) for c in reduced.courses],
+            [
+                ({1}, {1}, {2, 3}),
+                ({1}, {2}, {1, 3}),
+                ({2}, {2}, {2}),
+            ],
+        )
+
+
+@skipUnless(HAS_HIGHSPY, "highspy is not installed")
+class ConflictTests(TestCase):
+    def test_mandatory_schedules_and_teacher(self):
+        start, end = datetime.time(8), datetime.time(9)
+        snapshot = Snapshot(
+            org_pk=1,
+            periods=tuple(PeriodData(pk, pk, start, end, False) for pk in (1, 2)),
+            teachers=(TeacherData(1, "Teacher"), TeacherData(2, "Other")),
+            rooms=tuple(RoomData(pk, f"Room {pk}") for pk in (1, 2, 3)),
+            courses=(
+                CourseData(1, "A", 1, frozenset({1}), frozenset({1}), frozenset()),
+                CourseData(2, "B", 1, frozenset({1}), frozenset({2}), frozenset()),
+                CourseData(3, "C", 1, frozenset({2}), frozenset({3}), frozenset({2})),
+            ),
+            anchors=(),
+            mandatory_schedules=(
+                MandatoryScheduleData(1, "A and C", frozenset({1, 3})),
+                MandatoryScheduleData(2, "B and C", frozenset({2, 3})),
+            ),
+        )
+        self.assertEqual(check_snapshot(snapshot), [])
+        conflicts = explain_infeasibility(snapshot)
+        self.assertEqual(
+            [(c["kind"], c["pk"]) for c in conflicts],
+            [("mandatory_schedule", 1), ("mandatory_schedule", 2), ("teacher", 1)],
+        )
@@ -4,6 +4,7 @@ from django.contrib.auth import authenticate, login
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
 
 from courses import forms, models, tasks
 
@@ -53,6 +54,7 @@ def create_model_context(
         "model_name": get_model_name(model),
         "field_headers": field_headers,
         "fields": fields,
+        "kind": url_suffix,
         "url": {
             "add": "add_" + url_suffix,
             "edit": "edit_" + url_suffix,
@@ -320,10 +322,15 @@ def solver_results_detail(request, pk):
         for period in periods
     ]
     schedules = zip(periods, schedules)
+    conflicts = [
+        (conflict, f"{reverse('home')}#{conflict['kind']}-{conflict['pk']}")
+        for conflict in solved_schedule.conflicts
+    ]
     context = {
         "solved_schedule": solved_schedule,
         "schedules": schedules,
         "rooms": rooms,
+        "conflicts": conflicts,
     }
     return render(request, "courses/sovler_result_detail.html", context=context)
 
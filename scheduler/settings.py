@@ -6,6 +6,7 @@ from pathlib import Path
 from urllib.parse import urlparse
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -136,3 +137,83 @@ DRAMATIQ_BROKER = {
 }
 
 DRAMATIQ_TASKS_DATABASE = "default"
+
+SOLVER_DEFAULT_BACKEND = os.getenv("SOLVER_BACKEND", "neos")
+
+SOLVER_OPTIONS = {
+    "time_limit": float(os.getenv("SOLVER_TIME_LIMIT", "600")),
+    "mip_gap": float(os.getenv("SOLVER_MIP_GAP", "0")),
+    "threads": int(os.getenv("SOLVER_THREADS", "1")),
+    "symmetry_breaking": strtobool(os.getenv("SOLVER_SYMMETRY_BREAKING", "false")),
+    "two_stage": strtobool(os.getenv("SOLVER_TWO_STAGE", "false")),
+    "heuristic_start": strtobool(os.getenv("SOLVER_HEURISTIC_START", "false")),
+}
+
+SOLVER_BACKENDS = {
+    "neos": {
+        "BACKEND": "courses.solver.backends.NeosBackend",
+        "OPTIONS": {"solver": "minto"},
+    },
+    "highs": {
+        "BACKEND": "courses.solver.backends.AppsiBackend",
+        "OPTIONS": {"solver": "highs"},
+    },
+    "highs-matrix": {
+        "BACKEND": "courses.solver.backends.HighsBackend",
+        "OPTIONS": {"solver": "highs"},
+    },
+    "cbc": {
+        "BACKEND": "courses.solver.backends.PyomoBackend",
+        "OPTIONS": {"solver": "cbc"},
+    },
+    "glpk": {
+        "BACKEND": "courses.solver.backends.PyomoBackend",
+        "OPTIONS": {"solver": "glpk"},
+    },
+    "cbc-mps": {
+        "BACKEND": "courses.solver.mps.MpsBackend",
+        "OPTIONS": {"solver": "cbc"},
+    },
+    "glpk-mps": {
+        "BACKEND": "courses.solver.mps.MpsBackend",
+        "OPTIONS": {"solver": "glpk"},
+    },
+    "highs-mps": {
+        "BACKEND": "courses.solver.mps.MpsBackend",
+        "OPTIONS": {"solver": "highs"},
+    },
+    "highs-two-stage": {
+        "BACKEND": "courses.solver.backends.HighsBackend",
+        "OPTIONS": {"solver": "highs", "two_stage": True},
+    },
+    "highs-symmetry": {
+        "BACKEND": "courses.solver.backends.HighsBackend",
+        "OPTIONS": {"solver": "highs", "symmetry_breaking": True},
+    },
+    "heuristic": {
+        "BACKEND": "courses.solver.backends.HeuristicBackend",
+        "OPTIONS": {"time_limit": 10},
+    },
+}
+
+SOLUTION_CACHE_SIZE = int(os.getenv("SOLUTION_CACHE_SIZE", "10"))
+
+SOLVER_PROCESSES = int(os.getenv("SOLVER_PROCESSES", "1"))
+
+SOLVER_PORTFOLIO = [
+    name.strip()
+    for name in os.getenv("SOLVER_PORTFOLIO", "").split(",")
+    if name.strip()
+]
+for name in SOLVER_PORTFOLIO:
+    if name not in SOLVER_BACKENDS:
+        raise ImproperlyConfigured(
+            f"Unknown solver backend '{name}' in SOLVER_PORTFOLIO"
+        )
+
+SOLVER_ALTERNATIVE_CHANGES = int(os.getenv("SOLVER_ALTERNATIVE_CHANGES", "1"))
+
+SOLVER_PROGRESS_INTERVAL = float(os.getenv("SOLVER_PROGRESS_INTERVAL", "5"))
+
+SOLVER_CONFLICT_BACKEND = os.getenv("SOLVER_CONFLICT_BACKEND", "highs-matrix")
+SOLVER_CONFLICT_TIME_LIMIT = float(os.getenv("SOLVER_CONFLICT_TIME_LIMIT", "60"))